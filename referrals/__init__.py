@@ -1,11 +1,12 @@
 """Referral mailer package."""
 
 from .config import CONFIG, AppConfig
-from .run import execute_mailer, run_precheck
+from .run import Runner, execute_mailer, run_precheck
 
 __all__ = [
     "CONFIG",
     "AppConfig",
+    "Runner",
     "execute_mailer",
     "run_precheck",
 ]
@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import json
 import os
 from dataclasses import dataclass
 from pathlib import Path
@@ -8,6 +7,8 @@ from typing import Dict, Tuple
 
 from dotenv import load_dotenv
 
+from . import json_utils
+
 load_dotenv()
 
 
@@ -25,14 +26,21 @@ def _env_int(name: str, default: int = 0) -> int:
         return default
 
 
+def _env_float(name: str, default: float = 0.0) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
 def _parse_resume_map(raw: str | None) -> Dict[str, str]:
     if not raw:
         return {}
     try:
-        obj = json.loads(raw)
+        obj = json_utils.loads(raw)
         if isinstance(obj, dict):
             return {str(k).lower(): str(v) for k, v in obj.items()}
-    except json.JSONDecodeError:
+    except json_utils.JSONDecodeError:
         pass
 
     mapping: Dict[str, str] = {}
@@ -57,7 +65,7 @@ DEFAULT_TEMPLATES: Dict[str, str] = {
 }
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class SheetConfig:
     spreadsheet_id: str
     sheet_range: str
@@ -66,14 +74,14 @@ class SheetConfig:
     sent_at_column: str | None
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class AlertConfig:
     email: str
     mode: str
     subject_prefix: str
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ResumeConfig:
     default_name: str
     default_id: str | None
@@ -82,7 +90,7 @@ class ResumeConfig:
     local_path: Path
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class LLMConfig:
     enabled: bool
     provider: str
@@ -95,14 +103,23 @@ class LLMConfig:
     azure_endpoint: str | None
     azure_api_version: str | None
     azure_deployment: str | None
+    cache: bool
+    semantic_cache: bool
+    semantic_threshold: float
+    embedding_model: str
+    concurrency: int
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class AppConfig:
     scopes: Tuple[str, ...]
     contacts_csv: str
     templates: Dict[str, str]
     daily_limit: int
+    max_workers: int
+    send_rate: float
+    send_burst: int
+    gmail_batch_size: int
     dry_run: bool
     verbose: bool
     alert: AlertConfig
@@ -139,6 +156,11 @@ def load_config() -> AppConfig:
         azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
         azure_api_version=os.getenv("AZURE_OPENAI_API_VERSION", "2024-02-15-preview"),
         azure_deployment=os.getenv("AZURE_OPENAI_DEPLOYMENT"),
+        cache=_env_bool("LLM_CACHE", False),
+        semantic_cache=_env_bool("LLM_SEMANTIC_CACHE", False),
+        semantic_threshold=_env_float("LLM_SEMANTIC_THRESHOLD", 0.92),
+        embedding_model=os.getenv("LLM_EMBEDDING_MODEL", "text-embedding-3-small").strip(),
+        concurrency=max(1, _env_int("LLM_CONCURRENCY", 8)),
     )
 
     sheets = SheetConfig(
@@ -162,6 +184,11 @@ def load_config() -> AppConfig:
         contacts_csv=contacts_csv,
         templates=DEFAULT_TEMPLATES,
         daily_limit=daily_limit,
+        max_workers=max(1, _env_int("MAX_WORKERS", 8)),
+        send_rate=_env_float("SEND_RATE_PER_SEC", 2.0),
+        send_burst=max(1, _env_int("SEND_BURST", 10)),
+        # Gmail caps a batch at 100 calls and throttles large ones; 50 is the safe default.
+        gmail_batch_size=min(100, max(1, _env_int("GMAIL_BATCH_SIZE", 50))),
         dry_run=dry_run,
         verbose=verbose,
         alert=alert,
@@ -1,34 +1,53 @@
 from __future__ import annotations
 
+import functools
+import importlib.util
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+
 import pandas as pd
 
 from .config import AppConfig
 from . import google_clients, log_utils
 
 
+_NORM_RE = re.compile(r"[ \-]+")
+# pyarrow's multithreaded CSV reader is used when installed; the C engine otherwise.
+_HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+
+@functools.lru_cache(maxsize=256)
 def _normalize_col(name: str) -> str:
-    return name.strip().lower().replace(" ", "_").replace("-", "_")
+    return _NORM_RE.sub("_", name.strip().lower())
+
+
+# Header synonyms mapped to their canonical column; the first synonym present wins.
+_COLUMN_SYNONYMS: dict[str, str] = {
+    "personalizednote": "personalized_note",
+    "personalized_no": "personalized_note",
+    "resume": "resume_flag",
+    "jobid": "job_id",
+    "job_url": "job_link",
+    "joburl": "job_link",
+    "email_sent": "status",
+}
+
+
+def _apply_synonyms(columns: list[str]) -> list[str]:
+    present = set(columns)
+    renames: dict[str, str] = {}
+    for source, target in _COLUMN_SYNONYMS.items():
+        if source in present and target not in present:
+            renames[source] = target
+            present.add(target)
+    return [renames.get(column, column) for column in columns]
 
 
 def _normalize_df_columns(df: pd.DataFrame) -> pd.DataFrame:
-    data = df.copy()
-    data.columns = [_normalize_col(c) for c in data.columns]
-
-    if "personalized_note" not in data.columns and "personalizednote" in data.columns:
-        data["personalized_note"] = data["personalizednote"]
-    if "personalized_note" not in data.columns and "personalized_no" in data.columns:
-        data["personalized_note"] = data["personalized_no"]
-    if "resume_flag" not in data.columns and "resume" in data.columns:
-        data["resume_flag"] = data["resume"]
-    if "job_id" not in data.columns and "jobid" in data.columns:
-        data["job_id"] = data["jobid"]
-    if "job_link" not in data.columns and "job_url" in data.columns:
-        data["job_link"] = data["job_url"]
-    if "job_link" not in data.columns and "joburl" in data.columns:
-        data["job_link"] = data["joburl"]
-    if "status" not in data.columns and "email_sent" in data.columns:
-        data["status"] = data["email_sent"]
-    return data
+    columns = df.columns.str.strip().str.lower().str.replace(_NORM_RE, "_", regex=True)
+    return df.set_axis(_apply_synonyms(list(columns)), axis=1)
 
 
 def load_contacts_df(config: AppConfig) -> pd.DataFrame:
@@ -39,14 +58,22 @@ def load_contacts_df(config: AppConfig) -> pd.DataFrame:
             raise RuntimeError("Unable to load Google Sheets data: Sheets service unavailable.")
         return _load_from_sheet(config, sheets_service)
 
-    df = pd.read_csv(config.contacts_csv).fillna("")
+    # Every field is treated as text, so skip dtype inference and NaN detection entirely.
+    if _HAS_PYARROW:
+        df = pd.read_csv(config.contacts_csv, dtype=str, keep_default_na=False, na_values=[], engine="pyarrow")
+    else:
+        df = pd.read_csv(config.contacts_csv, dtype=str, na_filter=False, keep_default_na=False, engine="c")
     return _normalize_df_columns(df)
 
 
 def _load_from_sheet(config: AppConfig, sheets_service) -> pd.DataFrame:
     rng = config.sheets.sheet_range
     has_header = config.sheets.has_header
-    response = sheets_service.spreadsheets().values().get(spreadsheetId=config.sheets.spreadsheet_id, range=rng).execute()
+    response = sheets_service.spreadsheets().values().get(
+        spreadsheetId=config.sheets.spreadsheet_id,
+        range=rng,
+        majorDimension="ROWS",
+    ).execute(num_retries=google_clients.API_RETRIES)
     values = response.get("values", [])
     if not values:
         return pd.DataFrame(columns=["name", "email", "company", "role", "personalized_note", "template", "resume_flag"])
@@ -58,17 +85,18 @@ def _load_from_sheet(config: AppConfig, sheets_service) -> pd.DataFrame:
         headers = ["name", "email", "company", "role", "personalized_note", "template", "resume"]
         rows = values
 
-    norm_headers = [_normalize_col(h) for h in headers]
-    records = []
-    for idx, row in enumerate(rows):
-        entry = {}
-        for pos, header in enumerate(norm_headers):
-            entry[header] = row[pos] if pos < len(row) else ""
-        entry["sheet_row"] = (2 + idx) if has_header else (1 + idx)
-        records.append(entry)
-
-    df = pd.DataFrame.from_records(records).fillna("")
-    return _normalize_df_columns(df)
+    # Normalize the header list once here so the frame is built with its final columns.
+    norm_headers = _apply_synonyms([_normalize_col(h) for h in headers])
+    width = len(norm_headers)
+    # Sheets omits trailing empty cells; pad/trim every row to the header width up front
+    # so pandas builds the frame in one pass (and every cell is already a string).
+    padded = [row[:width] + [""] * (width - len(row)) for row in rows]
+    df = pd.DataFrame(padded, columns=norm_headers, dtype=object)
+    if df.columns.duplicated().any():
+        df = df.loc[:, ~df.columns.duplicated(keep="last")]
+    first_row = 2 if has_header else 1
+    df["sheet_row"] = range(first_row, first_row + len(df))
+    return df
 
 
 def _parse_sheet_name(rng: str) -> str | None:
@@ -77,25 +105,48 @@ def _parse_sheet_name(rng: str) -> str | None:
     return None
 
 
-def _get_sheet_headers(config: AppConfig, sheets_service) -> list[str]:
-    rng = config.sheets.sheet_range
-    result = sheets_service.spreadsheets().values().get(spreadsheetId=config.sheets.spreadsheet_id, range=rng).execute()
+def _header_row_range(rng: str) -> str:
+    """Narrow an A1 range such as ``Contacts!A:F`` to its first row (``Contacts!A1:F1``)."""
+    sheet_name = _parse_sheet_name(rng)
+    target = rng.split("!", 1)[1] if "!" in rng else rng
+    if ":" not in target:
+        return rng
+    start, end = target.split(":", 1)
+    start_col = "".join(ch for ch in start if ch.isalpha())
+    end_col = "".join(ch for ch in end if ch.isalpha())
+    start_row = "".join(ch for ch in start if ch.isdigit()) or "1"
+    if not start_col or not end_col:
+        return rng
+    prefix = f"{sheet_name}!" if sheet_name else ""
+    return f"{prefix}{start_col}{start_row}:{end_col}{start_row}"
+
+
+def get_sheet_headers(config: AppConfig, sheets_service) -> list[str]:
+    """Fetch the normalized header row of the configured range (one small values.get per run)."""
+    return list(_fetch_sheet_headers(sheets_service, config.sheets.spreadsheet_id, config.sheets.sheet_range))
+
+
+@functools.lru_cache(maxsize=8)
+def _fetch_sheet_headers(sheets_service, spreadsheet_id: str, sheet_range: str) -> tuple[str, ...]:
+    rng = _header_row_range(sheet_range)
+    request = sheets_service.spreadsheets().values().get(spreadsheetId=spreadsheet_id, range=rng)
+    result = request.execute(num_retries=google_clients.API_RETRIES)
     values = result.get("values", [])
     if not values:
-        return []
-    headers = values[0]
-    return [_normalize_col(h) for h in headers]
+        return ()
+    return tuple(_normalize_col(h) for h in values[0])
 
 
-def _col_index_by_name(headers: list[str], name: str) -> int | None:
-    name = _normalize_col(name)
-    try:
-        return headers.index(name)
-    except ValueError:
-        return None
+def reset_sheet_headers() -> None:
+    """Forget cached header rows so a new run sees inserted or reordered columns."""
+    _fetch_sheet_headers.cache_clear()
 
 
-def _num_to_col(num: int) -> str:
+def _col_index_by_name(header_index: dict[str, int], name: str) -> int | None:
+    return header_index.get(_normalize_col(name))
+
+
+def _num_to_col_slow(num: int) -> str:
     out = ""
     n = num
     while True:
@@ -107,10 +158,7 @@ def _num_to_col(num: int) -> str:
     return out
 
 
-def _col_to_num(col: str) -> int:
-    col = (col or "").strip().upper()
-    if not col:
-        return 0
+def _col_to_num_slow(col: str) -> int:
     num = 0
     for ch in col:
         if "A" <= ch <= "Z":
@@ -118,6 +166,25 @@ def _col_to_num(col: str) -> int:
     return max(0, num - 1)
 
 
+# Columns A..ZZ cover any realistic contacts sheet; wider ones take the slow path.
+_NUM_TO_COL = [_num_to_col_slow(i) for i in range(702)]
+_COL_TO_NUM = {col: i for i, col in enumerate(_NUM_TO_COL)}
+
+
+def _num_to_col(num: int) -> str:
+    if 0 <= num < len(_NUM_TO_COL):
+        return _NUM_TO_COL[num]
+    return _num_to_col_slow(num)
+
+
+def _col_to_num(col: str) -> int:
+    col = (col or "").strip().upper()
+    if not col:
+        return 0
+    num = _COL_TO_NUM.get(col)
+    return num if num is not None else _col_to_num_slow(col)
+
+
 def _a1_start_col_index(rng: str) -> int:
     target = rng.split("!", 1)[1] if "!" in rng else rng
     start = target.split(":", 1)[0]
@@ -127,67 +194,160 @@ def _a1_start_col_index(rng: str) -> int:
     return _col_to_num(letters)
 
 
-def mark_sheet_row_sent(config: AppConfig, sheets_service, row_number: int, status_value: str = "SENT") -> None:
-    if not config.sheets.spreadsheet_id or not row_number:
-        return
+@dataclass(frozen=True, slots=True)
+class SheetSchema:
+    """Header layout of the contacts sheet and the A1 pieces needed to write statuses back."""
 
-    headers = _get_sheet_headers(config, sheets_service)
-    if not headers:
-        return
+    headers: tuple[str, ...]
+    prefix: str
+    status_col: str | None
+    sent_at_col: str | None
+    # Normalized header -> first position, for O(1) column lookups by name.
+    header_index: dict[str, int] = field(default_factory=dict, compare=False)
 
-    status_override = config.sheets.status_column
-    sent_at_override = config.sheets.sent_at_column
 
-    status_idx = _col_index_by_name(headers, "status")
+def resolve_sheet_schema(config: AppConfig, sheets_service) -> SheetSchema:
+    """Read the header row once and resolve the status/sent_at column letters from it."""
+    headers = tuple(get_sheet_headers(config, sheets_service))
+    header_index: dict[str, int] = {}
+    for idx, header in enumerate(headers):
+        header_index.setdefault(header, idx)
+    status_idx = _col_index_by_name(header_index, "status")
     if status_idx is None:
-        status_idx = _col_index_by_name(headers, "email_sent")
-    sent_at_idx = _col_index_by_name(headers, "sent_at")
+        status_idx = _col_index_by_name(header_index, "email_sent")
+    sent_at_idx = _col_index_by_name(header_index, "sent_at")
+
+    rng = config.sheets.sheet_range
+    offset = _a1_start_col_index(rng)
+    status_col = config.sheets.status_column or (
+        _num_to_col(offset + status_idx) if status_idx is not None else None
+    )
+    sent_at_col = config.sheets.sent_at_column or (
+        _num_to_col(offset + sent_at_idx) if sent_at_idx is not None else None
+    )
+
+    sheet_name = _parse_sheet_name(rng)
+    prefix = f"{sheet_name}!" if sheet_name else ""
+    return SheetSchema(
+        headers=headers,
+        prefix=prefix,
+        status_col=status_col,
+        sent_at_col=sent_at_col,
+        header_index=header_index,
+    )
+
+
+def mark_sheet_row_sent(
+    config: AppConfig,
+    sheets_service,
+    row_number: int,
+    status_value: str = "SENT",
+    schema: SheetSchema | None = None,
+) -> None:
+    if not row_number:
+        return
+    mark_sheet_rows(config, sheets_service, [(row_number, status_value)], schema=schema)
 
-    offset = _a1_start_col_index(config.sheets.sheet_range)
 
-    status_col = status_override or (_num_to_col(offset + status_idx) if status_idx is not None else None)
-    sent_at_col = sent_at_override or (_num_to_col(offset + sent_at_idx) if sent_at_idx is not None else None)
+def mark_sheet_rows(
+    config: AppConfig,
+    sheets_service,
+    row_updates: list[tuple[int, str]],
+    schema: SheetSchema | None = None,
+) -> None:
+    """Write status (and sent_at) for many rows with a single batchUpdate call.
 
-    if not status_col and not sent_at_col:
+    Pass ``schema`` from :func:`resolve_sheet_schema` to skip resolving the header row.
+    """
+    row_updates = [(row, status) for row, status in row_updates if row]
+    if not config.sheets.spreadsheet_id or not row_updates:
         return
 
-    iso_ts = pd.Timestamp.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
-    sheet_name = _parse_sheet_name(config.sheets.sheet_range)
+    if schema is None:
+        schema = resolve_sheet_schema(config, sheets_service)
+    if not schema.headers:
+        return
+
+    # Column letters were resolved with the schema; join them with the sheet prefix once
+    # per flush so each row only appends its number.
+    status_ref = f"{schema.prefix}{schema.status_col}" if schema.status_col else None
+    sent_at_ref = f"{schema.prefix}{schema.sent_at_col}" if schema.sent_at_col else None
+    if not status_ref and not sent_at_ref:
+        return
+
+    iso_ts = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
 
     updates = []
-    if status_col:
-        ref = f"{status_col}{row_number}"
-        updates.append({
-            "range": f"{sheet_name + '!' if sheet_name else ''}{ref}",
-            "values": [[status_value]],
-        })
-    if sent_at_col:
-        ref = f"{sent_at_col}{row_number}"
-        updates.append({
-            "range": f"{sheet_name + '!' if sheet_name else ''}{ref}",
-            "values": [[iso_ts]],
-        })
+    for row_number, status_value in row_updates:
+        if status_ref:
+            updates.append({"range": f"{status_ref}{row_number}", "values": [[status_value]]})
+        if sent_at_ref:
+            updates.append({"range": f"{sent_at_ref}{row_number}", "values": [[iso_ts]]})
 
     body = {"data": updates, "valueInputOption": "RAW"}
     sheets_service.spreadsheets().values().batchUpdate(
         spreadsheetId=config.sheets.spreadsheet_id,
         body=body,
-    ).execute()
-
-
-def ensure_status_column(config: AppConfig, sheets_service) -> bool:
+    ).execute(num_retries=google_clients.API_RETRIES)
+
+
+class SheetWriteBuffer:
+    """Collects status write-backs and sends them in one values.batchUpdate per flush.
+
+    Updates are keyed by row, so a row queued twice (e.g. revalidated, then sent) is
+    written once with its latest status. Reaching ``flush_every`` queued rows triggers a
+    flush so a long run never holds an unbounded backlog.
+    """
+
+    def __init__(
+        self,
+        config: AppConfig,
+        sheets_service,
+        schema: SheetSchema | None = None,
+        flush_every: int = 500,
+    ) -> None:
+        self._config = config
+        self._sheets_service = sheets_service
+        self._schema = schema
+        self._flush_every = flush_every
+        self._pending: dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def queue_status(self, row_number: int, status_value: str) -> None:
+        if not row_number:
+            return
+        with self._lock:
+            self._pending.pop(row_number, None)  # re-append so rows flush in latest-update order
+            self._pending[row_number] = status_value
+            full = len(self._pending) >= self._flush_every
+        if full:
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            updates, self._pending = list(self._pending.items()), {}
+        if not updates:
+            return
+        try:
+            mark_sheet_rows(self._config, self._sheets_service, updates, schema=self._schema)
+        except Exception as exc:
+            rows = ", ".join(str(row) for row, _ in updates)
+            log_utils.log_error(f"Failed to update sheet rows {rows}: {exc}")
+
+
+def ensure_status_column(config: AppConfig, sheets_service, schema: SheetSchema | None = None) -> bool:
     if not config.sheets.spreadsheet_id:
         return True
 
-    headers = _get_sheet_headers(config, sheets_service)
-    if not headers:
+    if schema is None:
+        schema = resolve_sheet_schema(config, sheets_service)
+    if not schema.headers:
         return False
 
-    status_idx = _col_index_by_name(headers, "status")
-    if status_idx is None:
-        status_idx = _col_index_by_name(headers, "email_sent")
-
-    if status_idx is None and not config.sheets.status_column:
+    if schema.status_col is None:
         log_utils.log_error(
             "No 'status' or 'email_sent' column found in the first row of the configured SHEETS_RANGE. "
             "Update the range to include a status column and try again."
@@ -2,28 +2,88 @@ from __future__ import annotations
 from __future__ import annotations
 
 import base64
+import copy
+import email
+import functools
 import io
+import secrets
+import threading
+from email.generator import BytesGenerator
 from email.mime.application import MIMEApplication
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import Callable, Dict, Optional, Tuple
 
 from googleapiclient.discovery import Resource
-from googleapiclient.http import MediaIoBaseDownload
+from googleapiclient.http import MediaIoBaseDownload, MediaIoBaseUpload
 
 from .config import AppConfig
-from . import log_utils
+from . import google_clients, log_utils
 
+# Resolved resume attachments keyed by (flag, default name, default id). Most contacts share
+# a handful of resume variants, so each is downloaded from Drive once per run; see
+# reset_resume_cache. Misses and fallbacks are not stored, so the next row retries Drive.
+_resume_cache: Dict[Tuple[str, str, Optional[str]], Optional[Dict[str, object]]] = {}
+_resume_locks: Dict[Tuple[str, str, Optional[str]], threading.Lock] = {}
+_resume_cache_lock = threading.Lock()
 
-def create_message_with_attachment(
-    to: str,
-    subject: str,
-    body: str,
-    attachment: Optional[Dict[str, object]] = None,
-    attachment_path: Optional[Path] = None,
-    headers: Optional[Dict[str, str]] = None,
-) -> Dict[str, str]:
+# MediaIoBaseDownload defaults to 100 KB ranges; a resume should arrive in one request.
+_DRIVE_CHUNK_SIZE = 5 * 1024 * 1024
+# Gmail caps a JSON send body at about 5 MB; larger encoded messages use the upload endpoint.
+_RAW_UPLOAD_THRESHOLD = 4 * 1024 * 1024
+
+# Drive file metadata (name, mimeType) gathered by prefetch_drive_metadata.
+_drive_meta: Dict[str, Tuple[str, str]] = {}
+_drive_meta_lock = threading.Lock()
+# Google's batch endpoint accepts at most 100 calls per request.
+_DRIVE_BATCH_LIMIT = 100
+
+
+@functools.lru_cache(maxsize=8)
+def _attachment_part(data: bytes, filename: str, mime: str) -> MIMEApplication:
+    # MIMEApplication base64-encodes the payload on construction; build each distinct
+    # attachment once and hand out shallow copies that share the encoded payload.
+    subtype = "pdf" if mime.endswith("/pdf") or mime == "application/pdf" else "octet-stream"
+    part = MIMEApplication(data, _subtype=subtype)
+    part.add_header("Content-Disposition", "attachment", filename=filename)
+    return part
+
+
+@functools.lru_cache(maxsize=4)
+def _read_local_resume(path: str, mtime_ns: int) -> bytes:
+    # Every fallback to RESUME_PATH shares one bytes object (and so one cached MIME part).
+    with open(path, "rb") as handle:
+        return handle.read()
+
+
+# Boundary -> whether the first message spliced with that tail parsed back correctly.
+_tail_verified: Dict[str, bool] = {}
+
+
+@functools.lru_cache(maxsize=8)
+def _attachment_tail(data: bytes, filename: str, mime: str) -> Tuple[str, str]:
+    """Return a boundary and the base64 of the message from the attachment's delimiter on.
+
+    That tail is identical for every message carrying this attachment, so it is
+    serialized and encoded once; each message only encodes its own headers and body.
+    """
+    boundary = f"=_resume_{secrets.token_hex(12)}"
+    shell = MIMEMultipart()
+    shell.set_boundary(boundary)
+    shell.attach(copy.copy(_attachment_part(data, filename, mime)))
+    flat = _flatten(shell)
+    start = flat.index(f"\n--{boundary}\n".encode("ascii")) + 1
+    return boundary, base64.urlsafe_b64encode(flat[start:]).decode("ascii")
+
+
+def _flatten(msg: MIMEMultipart) -> bytes:
+    buffer = io.BytesIO()
+    BytesGenerator(buffer, mangle_from_=False, policy=msg.policy).flatten(msg)
+    return buffer.getvalue()
+
+
+def _text_message(to: str, subject: str, body: str, headers: Optional[Dict[str, str]]) -> MIMEMultipart:
     msg = MIMEMultipart()
     msg["To"] = to
     msg["Subject"] = subject
@@ -36,39 +96,158 @@ def create_message_with_attachment(
                 pass
 
     msg.attach(MIMEText(body, "plain", "utf-8"))
+    return msg
+
 
+def create_message_with_attachment(
+    to: str,
+    subject: str,
+    body: str,
+    attachment: Optional[Dict[str, object]] = None,
+    attachment_path: Optional[Path] = None,
+    headers: Optional[Dict[str, str]] = None,
+) -> Dict[str, str]:
+    resume: Optional[Tuple[bytes, str, str]] = None
     if attachment and attachment.get("bytes"):
-        data = attachment["bytes"]
-        filename = attachment.get("filename", "resume.pdf")
-        mime = attachment.get("mimeType", "application/pdf")
-        subtype = "pdf" if str(mime).endswith("/pdf") or mime == "application/pdf" else "octet-stream"
-        part = MIMEApplication(data, _subtype=subtype)
-        part.add_header("Content-Disposition", "attachment", filename=filename)
-        msg.attach(part)
-    elif attachment_path and attachment_path.exists():
-        with attachment_path.open("rb") as handle:
-            part = MIMEApplication(handle.read(), _subtype="pdf")
-        part.add_header("Content-Disposition", "attachment", filename=attachment_path.name)
-        msg.attach(part)
-
-    raw = base64.urlsafe_b64encode(msg.as_bytes()).decode("utf-8")
-    return {"raw": raw}
+        resume = (
+            bytes(attachment["bytes"]),
+            str(attachment.get("filename", "resume.pdf")),
+            str(attachment.get("mimeType", "application/pdf")),
+        )
+    elif attachment_path:
+        try:
+            mtime_ns = attachment_path.stat().st_mtime_ns
+        except OSError:
+            mtime_ns = None
+        if mtime_ns is not None:
+            resume = (_read_local_resume(str(attachment_path), mtime_ns), attachment_path.name, "application/pdf")
+
+    msg = _text_message(to, subject, body, headers)
+    if resume is None:
+        return {"raw": base64.urlsafe_b64encode(_flatten(msg)).decode("ascii")}
+
+    boundary, tail = _attachment_tail(*resume)
+    msg.set_boundary(boundary)
+    head = _flatten(msg)
+    closing = f"--{boundary}--\n".encode("ascii")
+    # The boundary should appear exactly three times: the Content-Type parameter, the text
+    # part's delimiter and the closing delimiter. Anything else (e.g. a header that happens
+    # to contain it) takes the full serialization path.
+    if _tail_verified.get(boundary, True) and head.endswith(closing) and head.count(boundary.encode("ascii")) == 3:
+        head = head[: -len(closing)]
+        # Pad to a multiple of 3 bytes so the two base64 strings concatenate cleanly. The
+        # extra newlines land after the base64-encoded text part, where decoders ignore them.
+        head += b"\n" * (-len(head) % 3)
+        raw = base64.urlsafe_b64encode(head).decode("ascii") + tail
+        if boundary in _tail_verified or _verify_splice(boundary, raw, body, resume[0]):
+            return {"raw": raw}
+
+    msg = _text_message(to, subject, body, headers)
+    msg.attach(copy.copy(_attachment_part(*resume)))
+    return {"raw": base64.urlsafe_b64encode(_flatten(msg)).decode("ascii")}
+
+
+def _verify_splice(boundary: str, raw: str, body: str, data: bytes) -> bool:
+    """Parse the first spliced message per attachment back; a mismatch disables splicing for it."""
+    parsed = email.message_from_bytes(base64.urlsafe_b64decode(raw))
+    parts = parsed.get_payload() if parsed.is_multipart() else []
+    ok = (
+        len(parts) == 2
+        and parts[0].get_payload(decode=True).decode("utf-8") == body
+        and parts[1].get_payload(decode=True) == data
+    )
+    if not ok:
+        log_utils.log_warn("Spliced message did not round-trip; building messages in full for this attachment.")
+    _tail_verified[boundary] = ok
+    return ok
 
 
 def send_message(service: Resource, user_id: str, message: Dict[str, str]) -> Dict:
-    return service.users().messages().send(userId=user_id, body=message).execute()
+    if len(message.get("raw", "")) > _RAW_UPLOAD_THRESHOLD:
+        return send_message_upload(service, user_id, message)
+    request = service.users().messages().send(userId=user_id, body=message)
+    return request.execute(num_retries=google_clients.API_RETRIES)
+
 
+def send_message_upload(service: Resource, user_id: str, message: Dict[str, str]) -> Dict:
+    """Send a large message as a resumable ``message/rfc822`` upload instead of a JSON body."""
+    data = base64.urlsafe_b64decode(message["raw"])
+    media = MediaIoBaseUpload(io.BytesIO(data), mimetype="message/rfc822", resumable=True)
+    request = service.users().messages().send(userId=user_id, media_body=media)
+    return request.execute(num_retries=google_clients.API_RETRIES)
 
+
+def send_message_batch(
+    service: Resource,
+    user_id: str,
+    messages: Dict[str, Dict[str, str]],
+    callback: Callable[[str, Optional[Dict], Optional[Exception]], None],
+) -> None:
+    """Send several messages over one batch HTTP request; ``callback`` runs per message.
+
+    Batch requests cannot carry media uploads, so messages above the JSON size limit are
+    sent one at a time through :func:`send_message_upload` before the batch goes out.
+    """
+    batched: Dict[str, Dict[str, str]] = {}
+    for request_id, message in messages.items():
+        if len(message.get("raw", "")) <= _RAW_UPLOAD_THRESHOLD:
+            batched[request_id] = message
+            continue
+        try:
+            response = send_message_upload(service, user_id, message)
+        except Exception as exc:
+            callback(request_id, None, exc)
+            continue
+        callback(request_id, response, None)
+    if not batched:
+        return
+    batch = service.new_batch_http_request(callback=callback)
+    for request_id, message in batched.items():
+        batch.add(service.users().messages().send(userId=user_id, body=message), request_id=request_id)
+    batch.execute()
+
+
+def prefetch_drive_metadata(drive_service, file_ids) -> None:
+    """Fetch name/mimeType for several Drive files over batch requests.
+
+    Drive batches cannot carry media downloads, so only the metadata lookups are
+    combined; :func:`fetch_drive_file` then goes straight to the download for these ids.
+    """
+    with _drive_meta_lock:
+        pending = [file_id for file_id in dict.fromkeys(file_ids) if file_id and file_id not in _drive_meta]
+    if drive_service is None or not pending:
+        return
+
+    def on_meta(request_id: str, response: Optional[Dict], exception: Optional[Exception]) -> None:
+        if exception is None and response:
+            with _drive_meta_lock:
+                _drive_meta[request_id] = (
+                    response.get("name", "resume.pdf"),
+                    response.get("mimeType", "application/pdf"),
+                )
+
+    for start in range(0, len(pending), _DRIVE_BATCH_LIMIT):
+        batch = drive_service.new_batch_http_request(callback=on_meta)
+        for file_id in pending[start:start + _DRIVE_BATCH_LIMIT]:
+            batch.add(drive_service.files().get(fileId=file_id, fields="name,mimeType"), request_id=file_id)
+        batch.execute()
+
+
+@functools.lru_cache(maxsize=16)
 def fetch_drive_file(drive_service, file_id: str) -> Tuple[bytes, str, str]:
-    meta = drive_service.files().get(fileId=file_id, fields="name,mimeType").execute()
-    filename = meta.get("name", "resume.pdf")
-    mime_type = meta.get("mimeType", "application/pdf")
+    with _drive_meta_lock:
+        meta = _drive_meta.get(file_id)
+    if meta is None:
+        meta_request = drive_service.files().get(fileId=file_id, fields="name,mimeType")
+        response = meta_request.execute(num_retries=google_clients.API_RETRIES)
+        meta = (response.get("name", "resume.pdf"), response.get("mimeType", "application/pdf"))
+    filename, mime_type = meta
     request = drive_service.files().get_media(fileId=file_id)
     buffer = io.BytesIO()
-    downloader = MediaIoBaseDownload(buffer, request)
+    downloader = MediaIoBaseDownload(buffer, request, chunksize=_DRIVE_CHUNK_SIZE)
     done = False
     while not done:
-        _, done = downloader.next_chunk()
+        _, done = downloader.next_chunk(num_retries=google_clients.API_RETRIES)
     return buffer.getvalue(), filename, mime_type
 
 
@@ -91,7 +270,7 @@ def find_drive_file_by_name(
             orderBy="modifiedTime desc",
             fields="files(id,name,mimeType,modifiedTime)",
             pageSize=10,
-        ).execute()
+        ).execute(num_retries=google_clients.API_RETRIES)
         files = response.get("files", [])
         if not files:
             return None, None, None
@@ -101,7 +280,10 @@ def find_drive_file_by_name(
         return None, None, None
 
 
-def _lookup_by_name_or_id(config: AppConfig, drive_service, file_id: Optional[str]) -> Optional[Dict[str, object]]:
+def _lookup_by_name_or_id(
+    config: AppConfig, drive_service, file_id: Optional[str]
+) -> Tuple[Optional[Dict[str, object]], bool]:
+    """Resolve the resume; the flag is False when a preferred source missed and a fallback won."""
     folder_id = config.resume.folder_id
 
     if file_id and file_id.lower().startswith("name:") and drive_service is not None:
@@ -109,12 +291,15 @@ def _lookup_by_name_or_id(config: AppConfig, drive_service, file_id: Optional[st
         match_id, match_name, match_mime = find_drive_file_by_name(drive_service, desired_name, folder_id=folder_id)
         if match_id:
             data, name, mime = fetch_drive_file(drive_service, match_id)
-            return {"bytes": data, "filename": name, "mimeType": mime}
+            return {"bytes": data, "filename": name, "mimeType": mime}, True
         file_id = None
+        cacheable = False
+    else:
+        cacheable = True
 
     if file_id and drive_service is not None:
         data, name, mime = fetch_drive_file(drive_service, file_id)
-        return {"bytes": data, "filename": name, "mimeType": mime}
+        return {"bytes": data, "filename": name, "mimeType": mime}, cacheable
 
     if config.resume.default_name and drive_service is not None:
         match_id, match_name, match_mime = find_drive_file_by_name(
@@ -122,25 +307,52 @@ def _lookup_by_name_or_id(config: AppConfig, drive_service, file_id: Optional[st
         )
         if match_id:
             data, name, mime = fetch_drive_file(drive_service, match_id)
-            return {"bytes": data, "filename": name, "mimeType": mime}
+            return {"bytes": data, "filename": name, "mimeType": mime}, cacheable
+        cacheable = False
 
     if config.resume.default_id and drive_service is not None:
         try:
             data, name, mime = fetch_drive_file(drive_service, config.resume.default_id)
-            return {"bytes": data, "filename": name, "mimeType": mime}
+            return {"bytes": data, "filename": name, "mimeType": mime}, cacheable
         except Exception as exc:  # pragma: no cover - external API failures
             log_utils.log_warn(f"Failed to fetch default resume by ID '{config.resume.default_id}': {exc}")
+            cacheable = False
 
     local_path = config.resume.local_path
     if local_path.exists():
-        with local_path.open("rb") as handle:
-            data = handle.read()
-        return {"bytes": data, "filename": local_path.name, "mimeType": "application/pdf"}
+        data = _read_local_resume(str(local_path), local_path.stat().st_mtime_ns)
+        return {"bytes": data, "filename": local_path.name, "mimeType": "application/pdf"}, cacheable
 
-    return None
+    return None, False
+
+
+def reset_resume_cache() -> None:
+    """Forget resolved resumes and Drive downloads so a new run sees current Drive files."""
+    with _resume_cache_lock:
+        _resume_cache.clear()
+        _resume_locks.clear()
+    with _drive_meta_lock:
+        _drive_meta.clear()
+    fetch_drive_file.cache_clear()
 
 
 def get_resume_attachment(config: AppConfig, drive_service, resume_flag: str | None) -> Optional[Dict[str, object]]:
     flag = (resume_flag or "").strip().lower()
     file_id = config.resume.resume_map.get(flag) if flag else None
-    return _lookup_by_name_or_id(config, drive_service, file_id)
\ No newline at end of file
+    # Keyed on the mapped file rather than the raw flag, so blank and unmapped flags all
+    # share the one default-resume lookup.
+    key = (file_id, config.resume.default_name, config.resume.default_id)
+    with _resume_cache_lock:
+        if key in _resume_cache:
+            return _resume_cache[key]
+        key_lock = _resume_locks.setdefault(key, threading.Lock())
+
+    # Concurrent rows asking for the same resume wait for one download instead of racing.
+    with key_lock:
+        if key in _resume_cache:
+            return _resume_cache[key]
+        attachment, cacheable = _lookup_by_name_or_id(config, drive_service, file_id)
+        if cacheable:
+            with _resume_cache_lock:
+                _resume_cache[key] = attachment
+        return attachment
\ No newline at end of file
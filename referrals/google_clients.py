@@ -1,17 +1,29 @@
 from __future__ import annotations
 
-import json
+import functools
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional, Tuple
 
+import httplib2
 from google.oauth2.credentials import Credentials
+from google_auth_httplib2 import AuthorizedHttp
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
 from googleapiclient.discovery import build
+from googleapiclient.http import HttpRequest
 
 from .config import AppConfig, SCOPES
-from . import log_utils
+from . import json_utils, log_utils
+
+
+# googleapiclient retries 429/5xx responses with exponential backoff when asked to.
+API_RETRIES = 3
+# CI runners cannot complete the browser OAuth flow; read once since the env is fixed.
+_IS_CI = bool(os.getenv("CI") or os.getenv("GITHUB_ACTIONS"))
 
 
 class CredentialError(RuntimeError):
@@ -27,8 +39,33 @@ def _token_path() -> Path:
 
 
 def _load_json(path: Path) -> dict:
-    with path.open("r", encoding="utf-8") as handle:
-        return json.load(handle)
+    # Keyed on mtime: precheck and the service builders share one parse of each file
+    # version. Callers only read the returned dict.
+    return _load_json_version(str(path), path.stat().st_mtime_ns)
+
+
+@functools.lru_cache(maxsize=8)
+def _load_json_version(path: str, mtime_ns: int) -> dict:
+    with open(path, "rb") as handle:
+        return json_utils.loads(handle.read())
+
+
+# Last token JSON written by this process, so an unchanged token is not rewritten.
+_LAST_TOKEN_JSON: Optional[str] = None
+_TOKEN_WRITE_LOCK = threading.Lock()
+
+
+def _save_token(path: Path, creds: Credentials) -> None:
+    """Persist ``creds`` atomically: a crash mid-write must not leave a truncated token.json."""
+    global _LAST_TOKEN_JSON
+    data = creds.to_json()
+    with _TOKEN_WRITE_LOCK:
+        if data == _LAST_TOKEN_JSON:
+            return
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_text(data, encoding="utf-8")
+        os.replace(tmp_path, path)
+        _LAST_TOKEN_JSON = data
 
 
 def preflight_validate_credentials(config: AppConfig) -> None:
@@ -64,7 +101,7 @@ def preflight_validate_credentials(config: AppConfig) -> None:
         if creds.expired and creds.refresh_token:
             try:
                 creds.refresh(Request())
-                token_path.write_text(creds.to_json(), encoding="utf-8")
+                _save_token(token_path, creds)
             except Exception as exc:
                 raise CredentialError(f"Google OAuth token refresh failed: {exc}") from exc
         else:
@@ -78,8 +115,21 @@ def preflight_validate_credentials(config: AppConfig) -> None:
 
     _validate_scopes(token_doc)
 
+    # Hand the freshly validated credentials to the service builders so a run that
+    # follows the precheck in the same process skips re-reading token.json.
+    global _CREDENTIALS
+    with _CACHE_LOCK:
+        if _CREDENTIALS is None:
+            _CREDENTIALS = creds
+
+
+_VALIDATED_TOKEN_DOC: Optional[dict] = None
+
 
 def _validate_scopes(token_doc: dict) -> None:
+    global _VALIDATED_TOKEN_DOC
+    if token_doc is _VALIDATED_TOKEN_DOC:
+        return  # same cached parse of an unchanged token.json
     scopes = token_doc.get("scopes") or token_doc.get("scope", "").split()
     normalized = {str(scope).strip() for scope in scopes if str(scope).strip()}
     missing_scopes = set(SCOPES) - normalized if normalized else set(SCOPES)
@@ -87,13 +137,14 @@ def _validate_scopes(token_doc: dict) -> None:
         raise CredentialError(f"token.json missing required scopes: {missing_scopes}")
     if "https://www.googleapis.com/auth/gmail.send" not in normalized:
         raise CredentialError("token.json missing gmail.send scope (required). Recreate the token with required permissions.")
+    _VALIDATED_TOKEN_DOC = token_doc
 
 
 def _build_credentials(config: AppConfig, interactive: bool = True) -> Credentials:
     creds: Optional[Credentials] = None
     token_path = _token_path()
     if token_path.exists():
-        creds = Credentials.from_authorized_user_file(str(token_path), config.scopes)
+        creds = Credentials.from_authorized_user_info(_load_json(token_path), config.scopes)
 
     if creds and creds.valid:
         return creds
@@ -105,7 +156,7 @@ def _build_credentials(config: AppConfig, interactive: bool = True) -> Credentia
             creds.refresh(Request())
             if config.refresh_debug:
                 log_utils.log_info("Gmail token refresh succeeded.", verbose=config.verbose)
-            token_path.write_text(creds.to_json(), encoding="utf-8")
+            _save_token(token_path, creds)
             return creds
         except Exception as exc:
             log_utils.log_error(f"Gmail token refresh failed: {exc}")
@@ -118,14 +169,112 @@ def _build_credentials(config: AppConfig, interactive: bool = True) -> Credentia
 
     flow = InstalledAppFlow.from_client_secrets_file(str(_credentials_path()), config.scopes)
     creds = flow.run_local_server(port=0)
-    token_path.write_text(creds.to_json(), encoding="utf-8")
+    _save_token(token_path, creds)
     return creds
 
 
+# Credentials and discovery-built services are shared by every caller in the process.
+_CACHE_LOCK = threading.RLock()
+_CREDENTIALS: Optional[Credentials] = None
+_SERVICES: Dict[Tuple[str, str], object] = {}
+
+
+def _get_credentials(config: AppConfig) -> Credentials:
+    global _CREDENTIALS
+    with _CACHE_LOCK:
+        # An expired token with a refresh token heals itself on the next request; one that
+        # cannot be refreshed is reloaded from token.json along with its services.
+        if _CREDENTIALS is not None and not (_CREDENTIALS.valid or _CREDENTIALS.refresh_token):
+            invalidate_credentials()
+        if _CREDENTIALS is None:
+            _CREDENTIALS = _build_credentials(config, interactive=not _IS_CI)
+        return _CREDENTIALS
+
+
+def invalidate_credentials() -> None:
+    """Drop the cached credentials and services, e.g. after a ``RefreshError``."""
+    global _CREDENTIALS
+    with _CACHE_LOCK:
+        _CREDENTIALS = None
+        _SERVICES.clear()
+
+
+# httplib2 connections are not thread-safe, so each worker thread owns one authorized
+# transport. It is shared by the Gmail, Drive and Sheets services so every keep-alive
+# connection that thread opens is reused by all three APIs.
+_THREAD_LOCAL = threading.local()
+# httplib2 waits forever by default; a stalled socket would pin a worker for the whole run.
+_HTTP_TIMEOUT_SECONDS = 60
+
+
+def _thread_http(creds: Credentials) -> AuthorizedHttp:
+    authed_http = getattr(_THREAD_LOCAL, "http", None)
+    if authed_http is None or authed_http.credentials is not creds:
+        authed_http = _THREAD_LOCAL.http = AuthorizedHttp(creds, http=httplib2.Http(timeout=_HTTP_TIMEOUT_SECONDS))
+    return authed_http
+
+
+# Tokens this close to expiry are refreshed in the background while the current one
+# keeps serving requests, so no send waits on an inline refresh.
+_STALE_WINDOW = timedelta(minutes=5)
+_REFRESH_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="token-refresh")
+_REFRESH_LOCK = threading.Lock()
+
+
+def _refresh_if_stale(creds: Credentials) -> None:
+    if not creds.refresh_token or creds.expiry is None or not creds.valid:
+        return  # expired tokens are refreshed inline by AuthorizedHttp, as before
+    if creds.expiry - datetime.now(timezone.utc).replace(tzinfo=None) > _STALE_WINDOW:
+        return
+    if _REFRESH_LOCK.acquire(blocking=False):
+        _REFRESH_EXECUTOR.submit(_background_refresh, creds)
+
+
+def _background_refresh(creds: Credentials) -> None:
+    try:
+        # Refresh a private copy so worker threads never see a half-updated token, then
+        # swap the new token into the shared credentials in one step. A requests-based
+        # transport of its own: the worker threads' httplib2 connections must not be used
+        # from this thread.
+        fresh = Credentials.from_authorized_user_info(json_utils.loads(creds.to_json()), creds.scopes)
+        fresh.refresh(Request())
+        with _CACHE_LOCK:
+            if _CREDENTIALS is not creds:
+                return  # invalidated while refreshing; the next start() builds new ones
+            creds.token, creds.expiry = fresh.token, fresh.expiry
+            _save_token(_token_path(), fresh)
+    except Exception as exc:
+        log_utils.log_warn(f"Background Google token refresh failed: {exc}")
+    finally:
+        _REFRESH_LOCK.release()
+
+
+def _build_service(api: str, version: str, creds: Credentials) -> object:
+    def request_builder(_http, *args, **kwargs) -> HttpRequest:
+        _refresh_if_stale(creds)
+        return HttpRequest(_thread_http(creds), *args, **kwargs)
+
+    return build(
+        api,
+        version,
+        credentials=creds,
+        requestBuilder=request_builder,
+        cache_discovery=False,
+        static_discovery=True,
+    )
+
+
+def _get_service(config: AppConfig, api: str, version: str) -> object:
+    with _CACHE_LOCK:
+        service = _SERVICES.get((api, version))
+        if service is None:
+            service = _SERVICES[(api, version)] = _build_service(api, version, _get_credentials(config))
+        return service
+
+
 def get_gmail_service(config: AppConfig) -> Optional[object]:
     try:
-        creds = _build_credentials(config, interactive=not (os.getenv("CI") or os.getenv("GITHUB_ACTIONS")))
-        return build("gmail", "v1", credentials=creds)
+        return _get_service(config, "gmail", "v1")
     except CredentialError as exc:
         log_utils.log_error(str(exc))
         return None
@@ -133,8 +282,7 @@ def get_gmail_service(config: AppConfig) -> Optional[object]:
 
 def get_drive_service(config: AppConfig) -> Optional[object]:
     try:
-        creds = _build_credentials(config, interactive=not (os.getenv("CI") or os.getenv("GITHUB_ACTIONS")))
-        return build("drive", "v3", credentials=creds)
+        return _get_service(config, "drive", "v3")
     except CredentialError as exc:
         log_utils.log_error(str(exc))
         return None
@@ -142,8 +290,7 @@ def get_drive_service(config: AppConfig) -> Optional[object]:
 
 def get_sheets_service(config: AppConfig) -> Optional[object]:
     try:
-        creds = _build_credentials(config, interactive=not (os.getenv("CI") or os.getenv("GITHUB_ACTIONS")))
-        return build("sheets", "v4", credentials=creds)
+        return _get_service(config, "sheets", "v4")
     except CredentialError as exc:
         log_utils.log_error(str(exc))
         return None
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import json
+import mmap
+import os
+from pathlib import Path
+from typing import Any
+
+try:  # optional speedup; stdlib json is used when orjson is not installed
+    import orjson
+except ImportError:  # pragma: no cover - depends on environment
+    orjson = None
+
+# orjson.JSONDecodeError subclasses this, so callers can catch one type either way.
+JSONDecodeError = json.JSONDecodeError
+
+# Below this size a plain read() is cheaper than setting up a memory map.
+_MMAP_MIN_BYTES = 1024 * 1024
+
+
+def loads(data: str | bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any, indent: bool = False, sort_keys: bool = False) -> bytes:
+    """Serialize ``obj`` to UTF-8 bytes, optionally indented by two spaces."""
+    if orjson is not None:
+        option = (orjson.OPT_INDENT_2 if indent else 0) | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        return orjson.dumps(obj, option=option)
+    return json.dumps(obj, indent=2 if indent else None, sort_keys=sort_keys, ensure_ascii=False).encode("utf-8")
+
+
+def load_path(path: Path) -> Any:
+    """Parse a JSON file; with orjson, large files are parsed straight from a memory map."""
+    with open(path, "rb") as handle:
+        # Only orjson parses a memoryview in place; stdlib json.loads needs str or bytes,
+        # and copying the map to bytes would cost more than a plain read().
+        if orjson is None or os.fstat(handle.fileno()).st_size < _MMAP_MIN_BYTES:
+            return loads(handle.read())
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            with memoryview(mapped) as view:
+                return orjson.loads(view)
@@ -1,18 +1,87 @@
 from __future__ import annotations
 
-import json
+import functools
+import threading
 from typing import Optional, Tuple
 
-from openai import OpenAI
+import numpy as np
+from openai import BadRequestError, OpenAI
 
 from .config import AppConfig
-from . import templates, log_utils
+from . import json_utils, llm_cache, templates, log_utils
 
 
 class LLMUnavailable(RuntimeError):
     """Raised when LLM configuration is incomplete."""
 
 
+_SYSTEM_PROMPT = (
+    "You are an assistant that drafts short, respectful, high-signal referral request emails. "
+    "Target length: 120–170 words. One clear ask. Professional and warm. "
+    "Include a concise 'why me' line tailored to the company/role. Use the provided personalization if present. "
+    "Write in plain text (no markdown). Respond with a JSON object with keys 'subject' and 'body'."
+)
+
+# Only the recipient and job fields vary per row; everything static sits in the system message.
+_USER_PROMPT = """Recipient: {name}
+Company: {company}
+Role: {role}
+Personalization: {note}
+{job_reference}
+Return JSON only."""
+
+# A 170-word draft plus subject and JSON framing fits well inside this; decode time grows
+# with the ceiling on slow tails.
+_MAX_TOKENS = 350
+
+# (provider, model) pairs that rejected response_format; they get prompt-only JSON.
+_NO_JSON_MODE: set[Tuple[str, str]] = set()
+
+
+def _rejects_json_mode(exc: BadRequestError) -> bool:
+    """True when the 400 is about response_format rather than the prompt or other arguments."""
+    if getattr(exc, "param", None) == "response_format":
+        return True
+    message = str(exc).lower()
+    return "response_format" in message or "json_object" in message or "json mode" in message
+
+
+_CANDIDATE_LINE = "Candidate: Ashutosh Choudhari — DS/ML/AI engineer. Portfolio: https://4ashutosh98.github.io"
+
+_GUIDANCE = (
+    "Guidance: Mention the job link only if one is provided in the request. "
+    "Focus on role and job ID when referencing the opportunity."
+)
+
+_INTENT_LINES = {
+    "coffee": (
+        "Email intent: Coffee chat — Avoid a direct referral ask; propose a brief 15–20 minute chat to learn about their experience. "
+        "It's okay to subtly indicate interest in a referral if the conversation goes well.\n"
+    ),
+    "direct": (
+        "Email intent: Direct referral — Be concise and polite; clearly ask for a referral and acknowledge their time. "
+        "You may mention that a resume is attached.\n"
+    ),
+}
+
+# The SDK default allows a 10-minute read; a 600-token draft never legitimately takes that long.
+_REQUEST_TIMEOUT_SECONDS = 60.0
+
+
+@functools.lru_cache(maxsize=4)
+def _make_client(api_key: str, base_url: Optional[str] = None) -> OpenAI:
+    # One client per endpoint so its connection pool (and TLS sessions) is reused across rows.
+    # The SDK retries 408/409/429/5xx with exponential backoff and honours Retry-After.
+    return OpenAI(api_key=api_key, base_url=base_url, timeout=_REQUEST_TIMEOUT_SECONDS, max_retries=4)
+
+
+@functools.lru_cache(maxsize=None)
+def _request_slots(limit: int) -> threading.BoundedSemaphore:
+    # Worker threads also render templates and fetch resumes; this caps only the number
+    # of completion and embedding requests in flight, which is what provider rate limits count.
+    return threading.BoundedSemaphore(limit)
+
+
 def _build_github_model_name(config: AppConfig) -> str:
     configured = config.llm.github_model or config.llm.model
     if "/" in configured:
@@ -20,12 +89,22 @@ def _build_github_model_name(config: AppConfig) -> str:
     return f"openai/{configured}"
 
 
+def _embed(client: OpenAI, config: AppConfig, text: str) -> np.ndarray:
+    model = config.llm.embedding_model
+    if config.llm.provider == "github" and "/" not in model:
+        model = f"openai/{model}"
+    with _request_slots(config.llm.concurrency):
+        response = client.embeddings.create(model=model, input=text)
+    vector = np.asarray(response.data[0].embedding, dtype=np.float32)
+    return vector / (np.linalg.norm(vector) or 1.0)
+
+
 def get_llm_client_and_model(config: AppConfig) -> Tuple[OpenAI, str]:
     provider = config.llm.provider
     if provider == "openai":
         if not config.llm.openai_api_key:
             raise LLMUnavailable("OPENAI_API_KEY not set; cannot use OpenAI provider")
-        client = OpenAI(api_key=config.llm.openai_api_key)
+        client = _make_client(config.llm.openai_api_key)
         return client, config.llm.model
 
     if provider == "azure":
@@ -33,21 +112,51 @@ def get_llm_client_and_model(config: AppConfig) -> Tuple[OpenAI, str]:
             raise LLMUnavailable(
                 "AZURE provider requires AZURE_OPENAI_ENDPOINT, AZURE_OPENAI_API_KEY, and AZURE_OPENAI_DEPLOYMENT"
             )
-        client = OpenAI(
-            api_key=config.llm.azure_api_key,
-            base_url=f"{config.llm.azure_endpoint}/openai/deployments/{config.llm.azure_deployment}",
+        client = _make_client(
+            config.llm.azure_api_key,
+            f"{config.llm.azure_endpoint}/openai/deployments/{config.llm.azure_deployment}",
         )
         return client, config.llm.azure_deployment
 
     if provider == "github":
         if not config.llm.github_token:
             raise LLMUnavailable("LLM_GITHUB_TOKEN not set; cannot use GitHub Models provider")
-        client = OpenAI(base_url=config.llm.github_endpoint or "https://models.github.ai/inference", api_key=config.llm.github_token)
+        client = _make_client(config.llm.github_token, config.llm.github_endpoint or "https://models.github.ai/inference")
         return client, _build_github_model_name(config)
 
     raise LLMUnavailable(f"Unsupported LLM_PROVIDER: {provider}")
 
 
+def _style_text(config: AppConfig, kind: str) -> str:
+    try:
+        return templates.load_template_text(config, kind)
+    except Exception:  # pragma: no cover - style inspiration is optional
+        return ""
+
+
+def _style_block(style_text: str) -> str:
+    if not style_text:
+        return ""
+    return (
+        "Style inspiration (do not copy verbatim; emulate tone, pacing, and structure):\n"
+        f"{style_text}\n"
+        "Notes: Ignore any variable markers like {{...}} or Subject: lines in the sample; generate fresh content.\n"
+    )
+
+
+# Everything that doesn't vary per recipient lives in the system message, so providers
+# with prefix prompt caching see an identical prefix on every call of the same kind. It is
+# keyed on the template text (itself cached per file version), so edits take effect.
+@functools.lru_cache(maxsize=16)
+def _compose_system_message(style_text: str, intent: str) -> str:
+    return f"{_SYSTEM_PROMPT}\n{_CANDIDATE_LINE}\n{_GUIDANCE}\n\n{_style_block(style_text)}{_INTENT_LINES.get(intent, '')}"
+
+
+def _system_message(config: AppConfig, inspiration_kind: Optional[str], intent: Optional[str]) -> str:
+    kind = inspiration_kind if inspiration_kind in {"cold", "warm"} else ""
+    return _compose_system_message(_style_text(config, kind) if kind else "", intent or "")
+
+
 def generate_email_with_llm(config: AppConfig, row_dict: dict, inspiration_kind: Optional[str] = None, intent: Optional[str] = None) -> Tuple[str, str]:
     client, model_name = get_llm_client_and_model(config)
 
@@ -58,40 +167,6 @@ def generate_email_with_llm(config: AppConfig, row_dict: dict, inspiration_kind:
     job_link = (row_dict.get("job_link") or "").strip()
     job_id = (row_dict.get("job_id") or "").strip()
 
-    style_text: Optional[str] = None
-    if inspiration_kind in {"cold", "warm"}:
-        try:
-            style_text = templates.load_template_text(config, inspiration_kind)
-        except Exception:  # pragma: no cover - fallback handled below
-            style_text = None
-
-    system_prompt = (
-        "You are an assistant that drafts short, respectful, high-signal referral request emails. "
-        "Target length: 120–170 words. One clear ask. Professional and warm. "
-        "Include a concise 'why me' line tailored to the company/role. Use the provided personalization if present. "
-        "Write in plain text (no markdown). Return ONLY JSON with keys 'subject' and 'body'."
-    )
-
-    style_block = ""
-    if style_text:
-        style_block = (
-            "Style inspiration (do not copy verbatim; emulate tone, pacing, and structure):\n"
-            f"{style_text}\n"
-            "Notes: Ignore any variable markers like {{...}} or Subject: lines in the sample; generate fresh content.\n"
-        )
-
-    intent_line = ""
-    if intent == "coffee":
-        intent_line = (
-            "Email intent: Coffee chat — Avoid a direct referral ask; propose a brief 15–20 minute chat to learn about their experience. "
-            "It's okay to subtly indicate interest in a referral if the conversation goes well.\n"
-        )
-    elif intent == "direct":
-        intent_line = (
-            "Email intent: Direct referral — Be concise and polite; clearly ask for a referral and acknowledge their time. "
-            "You may mention that a resume is attached.\n"
-        )
-
     job_reference_lines = []
     if job_id:
         job_reference_lines.append(f"Job ID: {job_id}")
@@ -99,43 +174,83 @@ def generate_email_with_llm(config: AppConfig, row_dict: dict, inspiration_kind:
         job_reference_lines.append(f"Job Link: {job_link}")
     job_reference_text = "\n".join(job_reference_lines) if job_reference_lines else ""
 
-    user_prompt = f"""{style_block}{intent_line}
-Recipient: {name}
-Company: {company}
-Role: {role}
-Personalization: {note or '(none)'}
-Candidate: Ashutosh Choudhari — DS/ML/AI engineer. Portfolio: https://4ashutosh98.github.io
-{job_reference_text}
-Guidance: Mention the job link only if one is provided above. Focus on role and job ID when referencing the opportunity.
-Return JSON only."""
+    user_prompt = _USER_PROMPT.format(
+        name=name, company=company, role=role, note=note or "(none)", job_reference=job_reference_text
+    )
 
-    if config.llm.provider == "azure":
-        response = client.chat.completions.create(
-            model=model_name,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
-            temperature=0.6,
-            max_tokens=600,
-            extra_query={"api-version": config.llm.azure_api_version},
-        )
-    else:
-        response = client.chat.completions.create(
-            model=model_name,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
-            temperature=0.6,
-            max_tokens=600,
+    system_message = _system_message(config, inspiration_kind, intent)
+    cache_key = None
+    if config.llm.cache:
+        cache_key = llm_cache.make_key(
+            provider=config.llm.provider, model=model_name, system=system_message, user=user_prompt
         )
+        cached = llm_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+    # Only generic drafts (no note or job reference) can be re-addressed to another
+    # recipient. Azure deployments are per-model, so the chat deployment can't embed.
+    semantic_vector = None
+    fields = {"name": str(name).strip(), "company": str(company).strip(), "role": str(role).strip()}
+    if config.llm.semantic_cache and config.llm.provider != "azure" and not (note or job_id or job_link):
+        try:
+            semantic_vector = _embed(
+                client, config, f"{inspiration_kind or ''}|{intent or ''}|{fields['company']}|{fields['role']}"
+            )
+        except Exception as exc:
+            log_utils.log_warn(f"Embedding request failed; skipping semantic cache: {exc}")
+        if semantic_vector is not None:
+            cached = llm_cache.semantic_get(semantic_vector, config.llm.semantic_threshold, fields)
+            if cached is not None:
+                return cached
+
+    extra_args: dict = {}
+    if config.llm.provider == "azure":
+        extra_args["extra_query"] = {"api-version": config.llm.azure_api_version}
+    elif config.llm.provider == "openai":
+        # Route calls sharing a system prefix to the same prompt-cache shard. Sent in the
+        # raw body because older openai SDKs reject prompt_cache_key as a keyword.
+        extra_args["extra_body"] = {"prompt_cache_key": f"referral-{inspiration_kind or 'none'}-{intent or 'none'}"}
+
+    messages = [
+        {"role": "system", "content": system_message},
+        {"role": "user", "content": user_prompt},
+    ]
+    json_mode_key = (config.llm.provider, model_name)
+    with _request_slots(config.llm.concurrency):
+        if json_mode_key not in _NO_JSON_MODE:
+            try:
+                response = client.chat.completions.create(
+                    model=model_name,
+                    messages=messages,
+                    temperature=0.6,
+                    max_tokens=_MAX_TOKENS,
+                    response_format={"type": "json_object"},
+                    **extra_args,
+                )
+            except BadRequestError as exc:
+                if not _rejects_json_mode(exc):
+                    raise
+                log_utils.log_warn(f"{model_name} rejected JSON mode; falling back to prompt-only JSON: {exc}")
+                _NO_JSON_MODE.add(json_mode_key)
+        if json_mode_key in _NO_JSON_MODE:
+            response = client.chat.completions.create(
+                model=model_name,
+                messages=messages,
+                temperature=0.6,
+                max_tokens=_MAX_TOKENS,
+                **extra_args,
+            )
 
     content = response.choices[0].message.content
     try:
-        payload = json.loads(content)
+        payload = json_utils.loads(content)
         subject = payload.get("subject", "Referral request")
         body = payload.get("body", content)
+        if cache_key is not None:
+            llm_cache.put(cache_key, subject, body)
+        if semantic_vector is not None:
+            llm_cache.semantic_put(semantic_vector, subject, body, fields)
         return subject, body
     except Exception as exc:  # pragma: no cover - fallback logic
         log_utils.log_warn(f"LLM returned non-JSON payload: {exc}")
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import hashlib
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from . import json_utils
+
+# Exact-match store of generated emails, so re-running the same contact (for example a
+# live run after a DRY_RUN preview) reuses the draft instead of calling the LLM again.
+LLM_CACHE_PATH = Path("llm_cache.sqlite3")
+
+_connection: Optional[sqlite3.Connection] = None
+_lock = threading.Lock()
+
+
+def _connect() -> sqlite3.Connection:
+    global _connection
+    if _connection is None:
+        _connection = sqlite3.connect(str(LLM_CACHE_PATH), check_same_thread=False)
+        _connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, subject TEXT NOT NULL, body TEXT NOT NULL)"
+        )
+        _connection.commit()
+    return _connection
+
+
+def make_key(**params: Any) -> str:
+    return hashlib.blake2b(json_utils.dumps(params, sort_keys=True), digest_size=20).hexdigest()
+
+
+def get(key: str) -> Optional[Tuple[str, str]]:
+    with _lock:
+        row = _connect().execute("SELECT subject, body FROM responses WHERE key = ?", (key,)).fetchone()
+    return (row[0], row[1]) if row else None
+
+
+def put(key: str, subject: str, body: str) -> None:
+    with _lock:
+        conn = _connect()
+        conn.execute("INSERT OR REPLACE INTO responses (key, subject, body) VALUES (?, ?, ?)", (key, subject, body))
+        conn.commit()
+
+
+# Semantic cache: drafts for near-identical (company, role, intent) requests, stored with
+# recipient fields swapped for placeholders and matched by embedding cosine similarity.
+_PLACEHOLDERS = {"name": "<<name>>", "company": "<<company>>", "role": "<<role>>"}
+# Shorter values ("Al", "HP") match inside ordinary words too often to template safely.
+_MIN_FIELD_LENGTH = 3
+_vectors: Optional[np.ndarray] = None
+_drafts: List[Tuple[str, str]] = []
+
+
+def _connect_semantic() -> sqlite3.Connection:
+    conn = _connect()
+    conn.execute("CREATE TABLE IF NOT EXISTS semantic (vector BLOB NOT NULL, subject TEXT NOT NULL, body TEXT NOT NULL)")
+    return conn
+
+
+def _load_semantic() -> np.ndarray:
+    global _vectors
+    if _vectors is None:
+        rows = _connect_semantic().execute("SELECT vector, subject, body FROM semantic").fetchall()
+        _drafts[:] = [(subject, body) for _, subject, body in rows]
+        if rows:
+            _vectors = np.vstack([np.frombuffer(vector, dtype=np.float32) for vector, _, _ in rows])
+        else:
+            _vectors = np.empty((0, 0), dtype=np.float32)
+    return _vectors
+
+
+def semantic_get(vector: np.ndarray, threshold: float, fields: Dict[str, str]) -> Optional[Tuple[str, str]]:
+    """Return the closest stored draft filled in with ``fields``, if it clears ``threshold``.
+
+    ``vector`` must be L2-normalised so the dot product is the cosine similarity.
+    """
+    with _lock:
+        vectors = _load_semantic()
+        if not len(vectors) or vectors.shape[1] != vector.shape[0]:
+            return None
+        scores = vectors @ vector
+        best = int(np.argmax(scores))
+        if scores[best] < threshold:
+            return None
+        subject, body = _drafts[best]
+    for field, placeholder in _PLACEHOLDERS.items():
+        subject = subject.replace(placeholder, fields[field])
+        body = body.replace(placeholder, fields[field])
+    return subject, body
+
+
+def _whole_word(value: str) -> re.Pattern:
+    return re.compile(r"(?<!\w)" + re.escape(value) + r"(?!\w)")
+
+
+def semantic_put(vector: np.ndarray, subject: str, body: str, fields: Dict[str, str]) -> None:
+    """Store a draft with the recipient fields replaced by placeholders.
+
+    Drafts that never mention the recipient's name, or whose fields are too short to
+    match as whole words, are skipped; they can't be safely re-addressed to someone else.
+    """
+    if any(0 < len(fields[field]) < _MIN_FIELD_LENGTH for field in _PLACEHOLDERS):
+        return
+    if not fields["name"] or not _whole_word(fields["name"]).search(body):
+        return
+    # Longest values first so a name inside the company (or vice versa) isn't split.
+    for field in sorted(_PLACEHOLDERS, key=lambda key: len(fields[key]), reverse=True):
+        if fields[field]:
+            pattern, placeholder = _whole_word(fields[field]), _PLACEHOLDERS[field]
+            subject = pattern.sub(placeholder, subject)
+            body = pattern.sub(placeholder, body)
+    global _vectors
+    vector = np.asarray(vector, dtype=np.float32)
+    with _lock:
+        vectors = _load_semantic()
+        conn = _connect_semantic()
+        conn.execute("INSERT INTO semantic (vector, subject, body) VALUES (?, ?, ?)", (vector.tobytes(), subject, body))
+        conn.commit()
+        _vectors = np.vstack([vectors, vector]) if len(vectors) else vector[np.newaxis, :]
+        _drafts.append((subject, body))
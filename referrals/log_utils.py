@@ -1,11 +1,17 @@
 from __future__ import annotations
 
-from typing import List, MutableSequence
+import threading
+import time
+from collections import deque
+from typing import Deque, Iterable, Tuple
 
 from .config import AlertConfig
 
-RUN_LOG: List[dict] = []
+# (timestamp, level, message) entries for the run recap; only the newest are kept.
+RUN_LOG_MAX_ENTRIES = 10_000
+RUN_LOG: Deque[Tuple[str, str, str]] = deque(maxlen=RUN_LOG_MAX_ENTRIES)
 ERROR_COUNT: int = 0
+_ERROR_LOCK = threading.Lock()
 
 
 def reset():
@@ -15,38 +21,32 @@ def reset():
 
 
 def _log_event(level: str, msg: str) -> None:
-    import time
-
-    ts = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
-    RUN_LOG.append({
-        "ts": ts,
-        "level": level.upper(),
-        "msg": msg,
-    })
+    RUN_LOG.append((time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()), level, msg))
 
 
 def log_info(msg: str, verbose: bool = False) -> None:
     if verbose:
         print(msg)
-    _log_event("info", msg)
+    _log_event("INFO", msg)
 
 
 def log_warn(msg: str, verbose: bool = False) -> None:
     if verbose:
         print(f"WARN: {msg}")
-    _log_event("warn", msg)
+    _log_event("WARN", msg)
 
 
 def log_error(msg: str) -> None:
     global ERROR_COUNT
-    ERROR_COUNT += 1
+    with _ERROR_LOCK:
+        ERROR_COUNT += 1
     print(f"ERROR: {msg}")
-    _log_event("error", msg)
+    _log_event("ERROR", msg)
 
 
-def render_run_log_text(entries: MutableSequence[dict] | None = None) -> str:
+def render_run_log_text(entries: Iterable[Tuple[str, str, str]] | None = None) -> str:
     log_entries = entries if entries is not None else RUN_LOG
-    return "\n".join(f"{e['ts']} [{e['level']}] {e['msg']}" for e in log_entries)
+    return "\n".join(f"{ts} [{level}] {msg}" for ts, level, msg in log_entries)
 
 
 def should_send_alert(alert: AlertConfig) -> bool:
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import threading
+import time
+
+
+class TokenBucket:
+    """Thread-safe token bucket for Gmail sends that adapts its rate to server feedback.
+
+    ``rate`` tokens are added per second up to ``burst``, so at most ``burst`` sends go
+    out back to back after an idle spell and the long-run average never exceeds ``rate``.
+    ``acquire(n)`` blocks until ``n`` tokens are available; callers sending a batch as
+    one request should keep ``n`` at or below ``burst``. ``throttle`` halves the refill
+    rate after a 429 or rate-limit 403; ``recover`` adds back a twentieth of the
+    configured rate per success until the configured rate is reached again. A rate of 0
+    disables pacing.
+    """
+
+    def __init__(self, rate: float, burst: float = 10.0) -> None:
+        self._max_rate = max(0.0, rate)
+        self._min_rate = self._max_rate / 16
+        self._rate = self._max_rate
+        self._burst = max(1.0, burst)
+        self._tokens = self._burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def rate(self) -> float:
+        return self._rate
+
+    @property
+    def burst(self) -> int:
+        return int(self._burst)
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        if not self._max_rate:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self._burst, self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+            # Going negative reserves a future token, so concurrent callers queue up
+            # behind each other instead of all waking at once.
+            self._tokens -= tokens
+            wait = -self._tokens / self._rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+
+    def throttle(self) -> None:
+        with self._lock:
+            self._rate = max(self._min_rate, self._rate / 2)
+
+    def recover(self) -> None:
+        with self._lock:
+            self._rate = min(self._max_rate, self._rate + self._max_rate / 20)
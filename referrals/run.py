@@ -1,12 +1,33 @@
 from __future__ import annotations
 
+import random
 import sys
+import threading
 import time
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+import pandas as pd
+from google.auth.exceptions import RefreshError
+from googleapiclient.errors import HttpError
 
 from .alerts import send_alert_email
 from .config import AppConfig, CONFIG
-from . import data_sources, emailer, google_clients, llm, log_utils, storage, templates
+from . import data_sources, emailer, google_clients, llm, log_utils, rate_limit, storage, templates
+
+# Gmail answers per-message 429/5xx inside a batch; those messages are resent with backoff.
+_RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
+# Gmail also signals per-user throttling as a 403 with one of these reasons; other 403s
+# (permissions, invalid recipient policy) are permanent.
+_RATE_LIMIT_REASONS = frozenset({"rateLimitExceeded", "userRateLimitExceeded"})
+_SEND_ATTEMPTS = 4
+_MAX_BACKOFF_SECONDS = 30.0
+# Sheet status values that mean the row was already emailed.
+_SENT_STATUSES = frozenset({"SENT", "YES", "TRUE", "1", "DONE"})
+# Static template kinds; an "llm-<kind>" template uses one of these as style inspiration.
+_TEMPLATE_KINDS = frozenset({"cold", "warm", "coffee", "direct"})
 
 
 def run_precheck(config: AppConfig = CONFIG) -> bool:
@@ -30,179 +51,578 @@ def execute_mailer(config: AppConfig = CONFIG) -> None:
         send_alert_email(service=None, config=config, subject_suffix="contacts load failure")
         return
 
-    gmail_service = google_clients.get_gmail_service(config)
-    if gmail_service is None:
-        log_utils.log_error("Unable to initialise Gmail service; aborting run.")
-        send_alert_email(service=None, config=config, subject_suffix="gmail service failure")
+    runner = Runner(config)
+    if not runner.start():
         return
+    runner.process_batch(contacts_df)
+    log_utils.log_info(f"Done. Sent {runner.sent_count}.", verbose=config.verbose)
+    if runner.aborted:
+        # The Gmail service holds the revoked credentials; print the log instead.
+        send_alert_email(service=None, config=config, subject_suffix="credentials revoked")
+        return
+    send_alert_email(runner.gmail_service, config)
+
+
+class Runner:
+    """Keeps services, the sent log and sheet headers resident across mailer passes.
+
+    ``execute_mailer`` uses a single pass; a long-lived process can call
+    :meth:`process_batch` repeatedly without paying OAuth and client setup each time.
+    DAILY_LIMIT applies to the whole lifetime of the runner.
+    """
+
+    def __init__(self, config: AppConfig = CONFIG) -> None:
+        self.config = config
+        self._ctx: Optional[_RunContext] = None
+
+    @property
+    def gmail_service(self) -> Any:
+        return self._ctx.gmail_service if self._ctx else None
+
+    @property
+    def sent_count(self) -> int:
+        return self._ctx.sent_count if self._ctx else 0
+
+    @property
+    def aborted(self) -> bool:
+        """True once the credentials were revoked mid-run; call :meth:`start` again to rebuild."""
+        return self._ctx.aborted if self._ctx else False
+
+    def start(self) -> bool:
+        """Build services and read the sheet headers; alerts and returns False on failure."""
+        config = self.config
+        gmail_service = google_clients.get_gmail_service(config)
+        if gmail_service is None:
+            log_utils.log_error("Unable to initialise Gmail service; aborting run.")
+            send_alert_email(service=None, config=config, subject_suffix="gmail service failure")
+            return False
+
+        templates.warm_templates(config)
+        emailer.reset_resume_cache()
+        data_sources.reset_sheet_headers()
+        drive_service = google_clients.get_drive_service(config)
+        sheets_service = google_clients.get_sheets_service(config) if config.sheets.spreadsheet_id else None
+
+        sheet_writes: Optional[data_sources.SheetWriteBuffer] = None
+        if config.sheets.spreadsheet_id and sheets_service is not None:
+            # The header row never changes mid-run: read it once for validation and write-back.
+            schema = data_sources.resolve_sheet_schema(config, sheets_service)
+            if not data_sources.ensure_status_column(config, sheets_service, schema=schema):
+                send_alert_email(gmail_service, config, subject_suffix="missing status column")
+                return False
+            sheet_writes = data_sources.SheetWriteBuffer(config, sheets_service, schema=schema)
+
+        self._ctx = _RunContext(
+            config=config,
+            gmail_service=gmail_service,
+            drive_service=drive_service,
+            sheets_service=sheets_service,
+            sent_log=storage.load_sent_log() if config.use_sent_log else {},
+            limiter=rate_limit.TokenBucket(config.send_rate, burst=config.send_burst),
+            sheet_writes=sheet_writes,
+            local_resume=config.resume.local_path if config.resume.local_path.exists() else None,
+            # A restart after a credentials abort keeps counting toward DAILY_LIMIT.
+            sent_count=self._ctx.sent_count if self._ctx else 0,
+        )
+        return True
 
-    drive_service = google_clients.get_drive_service(config)
-    sheets_service = google_clients.get_sheets_service(config) if config.sheets.spreadsheet_id else None
+    def process_batch(self, contacts_df: pd.DataFrame) -> int:
+        """Send to every actionable contact in ``contacts_df``; returns how many were sent."""
+        if self._ctx is None or self._ctx.aborted:
+            raise RuntimeError("Runner.start() must succeed before processing contacts.")
+        ctx = self._ctx
+        config = self.config
+        sent_before = ctx.sent_count
+
+        actionable = _select_actionable(ctx, contacts_df)
+        _prefetch_resumes(ctx, actionable)
+        if "sheet_row" not in actionable.columns:
+            actionable = actionable.assign(sheet_row=0)
+        # Plain tuples straight from the columns, wrapped as _Contact: no per-row dict.
+        rows = list(map(_Contact._make, actionable.loc[:, list(_Contact._fields)].itertuples(index=False, name=None)))
+        pending: list[_PreparedMessage] = []
+        # LLM rows spend nearly all their time waiting on the provider; size the pool so
+        # LLM_CONCURRENCY requests can actually be in flight at once.
+        workers = max(config.max_workers, config.llm.concurrency) if config.llm.enabled else config.max_workers
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_process_row, ctx, row) for row in rows]
+            for future in as_completed(futures):
+                try:
+                    prepared = future.result()
+                except Exception as exc:
+                    log_utils.log_error(f"Unexpected error while processing a contact: {exc}")
+                    continue
+                if prepared is None:
+                    continue
+                if ctx.aborted:
+                    ctx.finish_send(False)
+                    continue
+                pending.append(prepared)
+                if len(pending) >= config.gmail_batch_size:
+                    _send_batch(ctx, pending)
+                    # Write each batch's statuses back right away so an interrupted run
+                    # leaves the sheet in step with what was actually sent.
+                    ctx.flush_sheet_updates()
+                    pending = []
+                    if ctx.aborted:
+                        for pending_future in futures:
+                            pending_future.cancel()
+        if ctx.aborted:
+            for _ in pending:
+                ctx.finish_send(False)
+        else:
+            _send_batch(ctx, pending)
+        ctx.flush_sheet_updates()
 
-    if config.sheets.spreadsheet_id and sheets_service is not None:
-        if not data_sources.ensure_status_column(config, sheets_service):
-            send_alert_email(gmail_service, config, subject_suffix="missing status column")
-            return
+        if config.use_sent_log:
+            with ctx.sent_log_lock:
+                storage.save_sent_log(ctx.sent_log)
+        return ctx.sent_count - sent_before
 
-    sent_log = storage.load_sent_log() if config.use_sent_log else {}
-    spreadsheet_id = config.sheets.spreadsheet_id
-
-    sent_count = 0
-
-    def describe_contact() -> str:
-        safe_name = name or "(no name)"
-        safe_role = role or "(no role)"
-        safe_company = company or "(no company)"
-        return f"{safe_name} ({safe_role} @ {safe_company})"
-
-    for _, row in contacts_df.iterrows():
-        name = (row.get("name") or "").strip()
-        email = (row.get("email") or "").strip()
-        company = (row.get("company") or "").strip()
-        role = (row.get("role") or "").strip()
-        note = (row.get("personalized_note") or "").strip()
-        job_link = (row.get("job_link") or "").strip()
-        job_id = (row.get("job_id") or "").strip()
-        template_kind = (row.get("template", "cold") or "cold").lower()
-        sheet_row = int(row.get("sheet_row", 0) or 0)
-
-        raw_status = (row.get("status") or row.get("email_sent") or "").strip()
-        status_val = raw_status.upper()
-        contact_label = describe_contact()
-
-        if status_val in {"SENT", "YES", "TRUE", "1", "DONE"}:
-            log_utils.log_info(
-                f"SKIP (sheet marked SENT) -> {contact_label}",
-                verbose=config.verbose,
-            )
-            continue
-        if status_val == "REQUIRED_FIELD_MISSING":
-            log_utils.log_info(
-                f"Revalidating previously incomplete row -> {contact_label}",
-                verbose=config.verbose,
-            )
 
-        missing_fields = []
-        if not name:
-            missing_fields.append("name")
-        if not email:
-            missing_fields.append("email")
-        if not company:
-            missing_fields.append("company")
-        if not role:
-            missing_fields.append("role")
-        if not (row.get("template") or ""):
-            missing_fields.append("template")
-        resume_flag_value = (row.get("resume_flag") or row.get("resume") or "").strip()
-        if not resume_flag_value:
-            missing_fields.append("resume")
-
-        if missing_fields:
+def _prefetch_resumes(ctx: _RunContext, actionable: pd.DataFrame) -> None:
+    """Resolve every distinct resume the run needs, downloading them concurrently.
+
+    Results land in the emailer's resume cache, so workers never wait on Drive.
+    """
+    if actionable.empty:
+        return
+    flags = list(actionable["resume_flag"].unique())
+    # Mapped Drive ids get their metadata in one batch call; "name:" entries need a search.
+    resume_map = ctx.config.resume.resume_map
+    file_ids = [resume_map.get(flag) for flag in flags]
+    try:
+        emailer.prefetch_drive_metadata(
+            ctx.drive_service, [fid for fid in file_ids if fid and not fid.lower().startswith("name:")]
+        )
+    except Exception as exc:
+        log_utils.log_warn(f"Failed to batch-fetch resume metadata: {exc}")
+    with ThreadPoolExecutor(max_workers=min(len(flags), ctx.config.max_workers)) as executor:
+        futures = {
+            executor.submit(emailer.get_resume_attachment, ctx.config, ctx.drive_service, flag): flag
+            for flag in flags
+        }
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as exc:
+                # The row that needs it retries (and reports) the lookup itself.
+                log_utils.log_warn(f"Failed to prefetch resume for flag '{futures[future]}': {exc}")
+
+
+def _text_column(df: pd.DataFrame, name: str) -> pd.Series:
+    if name not in df.columns:
+        return pd.Series("", index=df.index, dtype=object)
+    return df[name].fillna("").astype(str).str.strip()
+
+
+def _fallback_column(df: pd.DataFrame, primary: str, fallback: str) -> pd.Series:
+    values = _text_column(df, primary)
+    if fallback in df.columns:
+        values = values.where(values != "", _text_column(df, fallback))
+    return values
+
+
+def _row_labels(name: pd.Series, role: pd.Series, company: pd.Series) -> pd.Series:
+    return (
+        name.where(name != "", "(no name)")
+        + " (" + role.where(role != "", "(no role)")
+        + " @ " + company.where(company != "", "(no company)") + ")"
+    )
+
+
+def _select_actionable(ctx: _RunContext, contacts_df: pd.DataFrame) -> pd.DataFrame:
+    """Apply the status, required-field, and dedup checks column-wise before dispatch.
+
+    Sheet-marked rows are skipped, incomplete rows are queued as
+    ``required_field_missing``, and previously incomplete rows that now validate have
+    their status cleared. Only the remaining rows reach the worker pool.
+    """
+    config = ctx.config
+    status = _fallback_column(contacts_df, "status", "email_sent").str.upper()
+    # Drop sheet-marked rows first: on a mostly-sent sheet they are the bulk of the frame,
+    # and none of the per-field work below applies to them.
+    sent_mask = status.isin(_SENT_STATUSES)
+    if sent_mask.any():
+        sent_df = contacts_df.loc[sent_mask]
+        sent_labels = _row_labels(
+            _text_column(sent_df, "name"), _text_column(sent_df, "role"), _text_column(sent_df, "company")
+        )
+        for label in sent_labels:
+            log_utils.log_info(f"SKIP (sheet marked SENT) -> {label}", verbose=config.verbose)
+        contacts_df = contacts_df.loc[~sent_mask]
+        status = status.loc[~sent_mask]
+
+    fields = {
+        "name": _text_column(contacts_df, "name"),
+        "email": _text_column(contacts_df, "email"),
+        "company": _text_column(contacts_df, "company"),
+        "role": _text_column(contacts_df, "role"),
+        "template": _text_column(contacts_df, "template"),
+        "resume": _fallback_column(contacts_df, "resume_flag", "resume"),
+    }
+    labels = _row_labels(fields["name"], fields["role"], fields["company"])
+    sheet_rows = (
+        pd.to_numeric(contacts_df["sheet_row"], errors="coerce").fillna(0).astype(int)
+        if "sheet_row" in contacts_df.columns
+        else pd.Series(0, index=contacts_df.index)
+    )
+
+    revalidate_mask = status == "REQUIRED_FIELD_MISSING"
+    for label in labels[revalidate_mask]:
+        log_utils.log_info(f"Revalidating previously incomplete row -> {label}", verbose=config.verbose)
+
+    missing = pd.DataFrame({field: values == "" for field, values in fields.items()})
+    missing_mask = missing.any(axis=1)
+    for idx in contacts_df.index[missing_mask]:
+        missing_fields = [field for field in fields if missing.at[idx, field]]
+        log_utils.log_info(
+            f"REQUIRED FIELD MISSING {missing_fields} -> {labels[idx]}",
+            verbose=config.verbose,
+        )
+        ctx.mark_row(int(sheet_rows[idx]), "required_field_missing")
+    for sheet_row in sheet_rows[revalidate_mask & ~missing_mask]:
+        ctx.mark_row(int(sheet_row), "")
+
+    # Workers receive every text field already stripped (template and resume flag also
+    # lower-cased), so nothing is re-normalized per row on the hot path.
+    normalized = contacts_df.assign(
+        name=fields["name"],
+        email=fields["email"],
+        company=fields["company"],
+        role=fields["role"],
+        template=fields["template"].str.lower(),
+        resume_flag=fields["resume"].str.lower(),
+        personalized_note=_text_column(contacts_df, "personalized_note"),
+        job_link=_text_column(contacts_df, "job_link"),
+        job_id=_text_column(contacts_df, "job_id"),
+    )
+    actionable = normalized.loc[~missing_mask]
+    if config.use_sent_log:
+        actionable = _drop_already_sent(actionable, ctx.sent_log, config)
+    return actionable
+
+
+def _drop_already_sent(contacts_df: pd.DataFrame, sent_log: dict, config: AppConfig) -> pd.DataFrame:
+    """Remove contacts already in the sent log (or repeated earlier in this run) before dispatch.
+
+    Keys mirror ``storage.already_sent``: ``name::role::company`` plus the legacy
+    ``email::role::company`` form. ``contacts_df`` comes from ``_select_actionable``, so
+    its text columns are already stripped.
+    """
+    name, email = contacts_df["name"], contacts_df["email"]
+    role, company = contacts_df["role"], contacts_df["company"]
+    suffix = "::" + role.str.lower() + "::" + company.str.lower()
+    keys = name.str.lower() + suffix
+    legacy_keys = email.str.lower() + suffix
+
+    # The log's keys are hashed once per batch; each contact costs two set probes.
+    sent_keys = sent_log.keys()
+    skip = keys.isin(sent_keys) | legacy_keys.isin(sent_keys) | keys.duplicated()
+    if not skip.any():
+        return contacts_df
+
+    labels = name[skip] + " (" + role[skip] + " @ " + company[skip] + ")"
+    for label in labels:
+        log_utils.log_info(f"SKIP already sent -> {label}", verbose=config.verbose)
+    return contacts_df.loc[~skip]
+
+
+class _Contact(NamedTuple):
+    """One actionable contact with its text fields already normalized."""
+
+    name: str
+    email: str
+    company: str
+    role: str
+    template: str
+    resume_flag: str
+    personalized_note: str
+    job_link: str
+    job_id: str
+    sheet_row: int
+
+
+@dataclass(slots=True)
+class _PreparedMessage:
+    """A rendered Gmail payload waiting for the next batch send."""
+
+    row: _Contact
+    email: str
+    contact_label: str
+    message: Dict[str, str]
+
+
+@dataclass(slots=True)
+class _RunContext:
+    """Services and shared state for one mailer run, safe to use from worker threads."""
+
+    config: AppConfig
+    gmail_service: Any
+    drive_service: Any
+    sheets_service: Any
+    sent_log: dict
+    limiter: rate_limit.TokenBucket
+    sheet_writes: Optional[data_sources.SheetWriteBuffer] = None
+    # RESUME_PATH when it exists, checked once per start() rather than per row.
+    local_resume: Optional[Path] = None
+    sent_log_lock: threading.Lock = field(default_factory=threading.Lock)
+    quota_lock: threading.Lock = field(default_factory=threading.Lock)
+    sent_count: int = 0
+    in_flight: int = 0
+    limit_logged: bool = False
+    # Set when the credentials are revoked mid-run; no further sends are attempted.
+    aborted: bool = False
+
+    def reserve_send(self) -> bool:
+        """Claim one of the DAILY_LIMIT slots; failed sends hand theirs back."""
+        limit = self.config.daily_limit
+        with self.quota_lock:
+            if self.aborted:
+                return False
+            if limit > 0 and self.sent_count + self.in_flight >= limit:
+                if not self.limit_logged:
+                    self.limit_logged = True
+                    log_utils.log_info("Daily limit reached. Stopping.", verbose=self.config.verbose)
+                return False
+            self.in_flight += 1
+            return True
+
+    def finish_send(self, sent: bool) -> None:
+        with self.quota_lock:
+            self.in_flight -= 1
+            if sent:
+                self.sent_count += 1
+
+    def mark_row(self, sheet_row: int, status_value: str) -> None:
+        """Queue a status write-back; queued rows go out in one batchUpdate per flush."""
+        if self.sheet_writes is not None:
+            self.sheet_writes.queue_status(sheet_row, status_value)
+
+    def flush_sheet_updates(self) -> None:
+        if self.sheet_writes is not None:
+            self.sheet_writes.flush()
+
+
+def _process_row(ctx: _RunContext, row: _Contact) -> Optional[_PreparedMessage]:
+    """Render one validated contact; returns the message to send, if any."""
+    config = ctx.config
+
+    email = row.email
+    template_kind = row.template or "cold"
+    contact_label = f"{row.name} ({row.role} @ {row.company})"
+
+    if not config.dry_run and not ctx.reserve_send():
+        return None
+
+    prepared = None
+    try:
+        subject, body = _compose(config, row, template_kind, contact_label)
+        prepared = _prepare(ctx, row, email, subject, body, contact_label)
+        return prepared
+    finally:
+        if not config.dry_run and prepared is None:
+            ctx.finish_send(False)
+
+
+def _render_template(config: AppConfig, template_kind: str, row: _Contact) -> Tuple[str, str]:
+    rendered = templates.render_template(
+        config,
+        template_kind,
+        name=row.name,
+        company=row.company,
+        role=row.role,
+        personalized_note=row.personalized_note,
+        job_link=row.job_link,
+        job_id=row.job_id,
+    )
+    return _split_subject(rendered)
+
+
+def _compose(config: AppConfig, row: _Contact, template_kind: str, contact_label: str) -> Tuple[str, str]:
+    note = row.personalized_note
+    template_value = row.template
+    if template_value.startswith("llm") and config.llm.enabled:
+        try:
+            inspiration = None
+            if "-" in template_value:
+                explicit = template_value.split("-", 1)[1]
+                if explicit in _TEMPLATE_KINDS:
+                    inspiration = explicit
+            if inspiration is None:
+                inspiration = "warm" if note else "cold"
+            intent = "coffee" if inspiration == "coffee" else ("direct" if inspiration == "direct" else None)
             log_utils.log_info(
-                f"REQUIRED FIELD MISSING {missing_fields} -> {contact_label}",
+                f"LLM mode -> provider={config.llm.provider}, model={config.llm.model}; style inspiration={inspiration}; intent={intent or 'auto'}",
                 verbose=config.verbose,
             )
-            if spreadsheet_id and sheet_row and sheets_service is not None:
-                try:
-                    data_sources.mark_sheet_row_sent(config, sheets_service, sheet_row, status_value="required_field_missing")
-                except Exception as exc:
-                    log_utils.log_error(f"Failed to mark sheet row {sheet_row} (missing fields): {exc}")
-            continue
-        else:
-            if status_val == "REQUIRED_FIELD_MISSING" and spreadsheet_id and sheet_row and sheets_service is not None:
-                try:
-                    data_sources.mark_sheet_row_sent(config, sheets_service, sheet_row, status_value="")
-                except Exception as exc:
-                    log_utils.log_error(f"Failed to clear status for sheet row {sheet_row}: {exc}")
+            return llm.generate_email_with_llm(config, row._asdict(), inspiration_kind=inspiration, intent=intent)
+        except Exception as exc:
+            log_utils.log_error(f"LLM error for {contact_label}: {exc}; falling back to template '{template_kind}'")
+            return _render_template(config, template_kind, row)
+
+    template_kind = template_kind if template_kind in _TEMPLATE_KINDS else "cold"
+    return _render_template(config, template_kind, row)
+
 
-        if config.use_sent_log and storage.already_sent(sent_log, name, email, role, company):
-            log_utils.log_info(f"SKIP already sent -> {contact_label}", verbose=config.verbose)
-            continue
+def _prepare(
+    ctx: _RunContext,
+    row: _Contact,
+    email: str,
+    subject: str,
+    body: str,
+    contact_label: str,
+) -> Optional[_PreparedMessage]:
+    config = ctx.config
 
-        if config.daily_limit > 0 and sent_count >= config.daily_limit:
-            log_utils.log_info("Daily limit reached. Stopping.", verbose=config.verbose)
-            break
+    attachment = None
+    resume_flag = row.resume_flag
+    try:
+        attachment = emailer.get_resume_attachment(config, ctx.drive_service, resume_flag)
+    except Exception as exc:
+        log_utils.log_error(f"Failed to fetch resume for flag '{resume_flag}': {exc}")
+
+    if config.dry_run:
+        attachment_info = "no"
+        if attachment:
+            attachment_info = f"yes ({attachment.get('filename')})"
+        elif ctx.local_resume is not None:
+            attachment_info = f"yes ({ctx.local_resume.name})"
+        if config.verbose:
+            print(f"-- DRY RUN -- To: {contact_label}\nSubject: {subject}\n{body}\n(attached: {attachment_info})\n---")
+        _record_sent(ctx, row, email, "DRY_RUN", status_value="DRY_RUN")
+        return None
 
-        row_dict = row.to_dict()
+    try:
+        message = emailer.create_message_with_attachment(email, subject, body, attachment=attachment,
+                                                         attachment_path=ctx.local_resume if not attachment else None)
+    except Exception as exc:
+        log_utils.log_error(f"ERROR sending to {contact_label}: {exc}")
+        return None
+    return _PreparedMessage(row=row, email=email, contact_label=contact_label, message=message)
 
-        subject: str
-        body: str
 
-        template_value = (row_dict.get("template", "") or "").lower()
-        if template_value.startswith("llm") and config.llm.enabled:
-            try:
-                inspiration = None
-                if "-" in template_value:
-                    explicit = template_value.split("-", 1)[1]
-                    if explicit in {"coffee", "direct", "warm", "cold"}:
-                        inspiration = explicit
-                if inspiration is None:
-                    inspiration = "warm" if note else "cold"
-                intent = "coffee" if inspiration == "coffee" else ("direct" if inspiration == "direct" else None)
-                log_utils.log_info(
-                    f"LLM mode -> provider={config.llm.provider}, model={config.llm.model}; style inspiration={inspiration}; intent={intent or 'auto'}",
-                    verbose=config.verbose,
-                )
-                subject, body = llm.generate_email_with_llm(config, row_dict, inspiration_kind=inspiration, intent=intent)
-            except Exception as exc:
-                log_utils.log_error(f"LLM error for {contact_label}: {exc}; falling back to template '{template_kind}'")
-                tmpl = templates.load_template(config, template_kind)
-                rendered = tmpl.render(name=name, company=company, role=role, personalized_note=note, job_link=job_link, job_id=job_id)
-                subject, body = _split_subject(rendered)
-        else:
-            template_kind = template_kind if template_kind in {"cold", "warm", "coffee", "direct"} else "cold"
-            tmpl = templates.load_template(config, template_kind)
-            rendered = tmpl.render(name=name, company=company, role=role, personalized_note=note, job_link=job_link, job_id=job_id)
-            subject, body = _split_subject(rendered)
+def _retry_after_seconds(exc: Exception) -> float:
+    try:
+        return float(exc.resp.get("retry-after", 0))  # type: ignore[attr-defined]
+    except (AttributeError, TypeError, ValueError):
+        return 0.0
 
-        attachment = None
-        resume_flag = (row.get("resume_flag") or row.get("resume") or "").strip().lower()
-        try:
-            attachment = emailer.get_resume_attachment(config, drive_service, resume_flag)
-        except Exception as exc:
-            log_utils.log_error(f"Failed to fetch resume for flag '{resume_flag}': {exc}")
-
-        if config.dry_run:
-            attachment_info = "no"
-            if attachment:
-                attachment_info = f"yes ({attachment.get('filename')})"
-            elif config.resume.local_path.exists():
-                attachment_info = f"yes ({config.resume.local_path.name})"
-            if config.verbose:
-                print(f"-- DRY RUN -- To: {contact_label}\nSubject: {subject}\n{body}\n(attached: {attachment_info})\n---")
-            if config.use_sent_log:
-                storage.mark_sent(sent_log, name, email, role, company, "DRY_RUN")
-            if spreadsheet_id and sheet_row and sheets_service is not None:
-                try:
-                    data_sources.mark_sheet_row_sent(config, sheets_service, sheet_row, status_value="DRY_RUN")
-                except Exception as exc:
-                    log_utils.log_error(f"Failed to mark sheet row {sheet_row} (dry run): {exc}")
-            continue
 
-        try:
-            message = emailer.create_message_with_attachment(email, subject, body, attachment=attachment,
-                                                             attachment_path=config.resume.local_path if config.resume.local_path.exists() and not attachment else None)
-            response = emailer.send_message(gmail_service, "me", message)
-            message_id = response.get("id", "UNKNOWN")
-            if config.use_sent_log:
-                storage.mark_sent(sent_log, name, email, role, company, message_id)
-            sent_count += 1
-            log_utils.log_info(f"SENT -> {contact_label} (id={message_id})", verbose=config.verbose)
-            if config.use_sent_log:
-                storage.save_sent_log(sent_log)
-            if spreadsheet_id and sheet_row and sheets_service is not None:
-                try:
-                    data_sources.mark_sheet_row_sent(config, sheets_service, sheet_row, status_value="SENT")
-                except Exception as exc:
-                    log_utils.log_error(f"Failed to mark sheet row {sheet_row}: {exc}")
-            time.sleep(1.5)
-        except Exception as exc:
-            log_utils.log_error(f"ERROR sending to {contact_label}: {exc}")
+def _status_of(exc: Exception) -> int:
+    return exc.resp.status if isinstance(exc, HttpError) else 0
 
-    if config.use_sent_log:
-        storage.save_sent_log(sent_log)
-    log_utils.log_info(f"Done. Sent {sent_count}.", verbose=config.verbose)
-    send_alert_email(gmail_service, config)
+
+def _is_rate_limited(exc: Exception) -> bool:
+    status = _status_of(exc)
+    if status == 429:
+        return True
+    if status != 403:
+        return False
+    details = getattr(exc, "error_details", None)
+    if isinstance(details, list):
+        return any(isinstance(detail, dict) and detail.get("reason") in _RATE_LIMIT_REASONS for detail in details)
+    return any(reason in str(details or exc) for reason in _RATE_LIMIT_REASONS)
+
+
+def _is_transient(exc: Exception) -> bool:
+    return _status_of(exc) in _RETRYABLE_STATUS or _is_rate_limited(exc)
+
+
+def _send_batch(ctx: _RunContext, prepared: list[_PreparedMessage]) -> None:
+    """Send prepared messages through Gmail batch requests, pacing each message.
+
+    Messages rejected with 429/5xx or a rate-limit 403 are resent in a smaller batch after
+    an exponential, jittered backoff (or the server's Retry-After), up to
+    ``_SEND_ATTEMPTS`` times.
+    """
+    pending = {str(idx): item for idx, item in enumerate(prepared)}
+    for attempt in range(_SEND_ATTEMPTS):
+        if not pending:
+            return
+        final = attempt == _SEND_ATTEMPTS - 1
+        # A batch request reaches Gmail as one burst, so while pacing is on each request
+        # carries at most SEND_BURST messages.
+        step = ctx.limiter.burst if ctx.limiter.rate else len(pending)
+        ids = list(pending)
+        retry: Dict[str, _PreparedMessage] = {}
+        retry_after = 0.0
+        for start in range(0, len(ids), step):
+            if ctx.aborted:
+                retry.update({request_id: pending[request_id] for request_id in ids[start:]})
+                break
+            chunk = {request_id: pending[request_id] for request_id in ids[start:start + step]}
+            chunk_retry, chunk_after = _send_batch_once(ctx, chunk, final)
+            retry.update(chunk_retry)
+            retry_after = max(retry_after, chunk_after)
+        pending = retry
+        if ctx.aborted:
+            for _ in pending:
+                ctx.finish_send(False)
+            return
+        if pending:
+            delay = max(retry_after, min(_MAX_BACKOFF_SECONDS, 2 ** attempt) * random.uniform(0.5, 1.0))
+            log_utils.log_warn(f"Gmail throttled {len(pending)} message(s); retrying in {delay:.1f}s.")
+            time.sleep(delay)
+
+
+def _send_batch_once(
+    ctx: _RunContext, by_id: Dict[str, _PreparedMessage], final: bool
+) -> Tuple[Dict[str, _PreparedMessage], float]:
+    """Run one batch request; returns the messages to retry and the longest Retry-After."""
+    handled: set[str] = set()
+    retry: Dict[str, _PreparedMessage] = {}
+    retry_after = 0.0
+
+    def on_sent(request_id: str, response: Optional[dict], exception: Optional[Exception]) -> None:
+        nonlocal retry_after
+        handled.add(request_id)
+        item = by_id[request_id]
+        if exception is not None:
+            if not final and _is_transient(exception):
+                if _is_rate_limited(exception):
+                    ctx.limiter.throttle()
+                retry[request_id] = item  # keeps its DAILY_LIMIT slot
+                retry_after = max(retry_after, _retry_after_seconds(exception))
+                return
+            log_utils.log_error(f"ERROR sending to {item.contact_label}: {exception}")
+            ctx.finish_send(False)
+            return
+        message_id = (response or {}).get("id", "UNKNOWN")
+        ctx.limiter.recover()
+        ctx.finish_send(True)
+        log_utils.log_info(f"SENT -> {item.contact_label} (id={message_id})", verbose=ctx.config.verbose)
+        _record_sent(ctx, item.row, item.email, message_id, status_value="SENT")
+
+    ctx.limiter.acquire(len(by_id))
+    try:
+        emailer.send_message_batch(
+            ctx.gmail_service, "me", {request_id: item.message for request_id, item in by_id.items()}, on_sent
+        )
+    except Exception as exc:
+        unhandled = by_id.keys() - handled
+        # Only a batch the server explicitly rejected is safe to resend; after a dropped
+        # connection some of these messages may already have gone out.
+        if not final and _is_transient(exc):
+            retry.update({request_id: by_id[request_id] for request_id in unhandled})
+            return retry, max(retry_after, _retry_after_seconds(exc))
+        log_utils.log_error(f"ERROR sending batch of {len(by_id)} messages: {exc}")
+        if isinstance(exc, RefreshError):
+            # Every service built from these credentials is unusable now: stop the run
+            # and drop the cached credentials so a fresh start() reloads token.json.
+            log_utils.log_error("Google credentials can no longer be refreshed; aborting run.")
+            google_clients.invalidate_credentials()
+            ctx.aborted = True
+        for _ in unhandled:
+            ctx.finish_send(False)
+    return retry, retry_after
+
+
+def _record_sent(ctx: _RunContext, row: _Contact, email: str, message_id: str, status_value: str) -> None:
+    if ctx.config.use_sent_log:
+        with ctx.sent_log_lock:
+            storage.mark_sent(ctx.sent_log, row.name, email, row.role, row.company, message_id)
+    ctx.mark_row(int(row.sheet_row or 0), status_value)
 
 
 def _split_subject(rendered: str) -> tuple[str, str]:
@@ -1,37 +1,90 @@
 from __future__ import annotations
 
-import json
+import os
+import threading
 import time
 from pathlib import Path
-from typing import Dict
+from typing import BinaryIO, Dict, Optional, Tuple
+
+from . import json_utils
 
 SENT_LOG_PATH = Path("sent_log.json")
+# Append-only journal of sends since the last snapshot; folded into SENT_LOG_PATH on save.
+SENT_JOURNAL_PATH = Path("sent_log.jsonl")
+
+_journal: Optional[BinaryIO] = None
+_journal_lock = threading.Lock()
 
 
 def load_sent_log() -> Dict:
-    if SENT_LOG_PATH.exists():
-        with SENT_LOG_PATH.open("r", encoding="utf-8") as handle:
-            return json.load(handle)
-    return {}
+    log: Dict = {}
+    if SENT_LOG_PATH.exists() and SENT_LOG_PATH.stat().st_size:
+        log = json_utils.load_path(SENT_LOG_PATH)
+    if SENT_JOURNAL_PATH.exists():
+        with SENT_JOURNAL_PATH.open("r+b") as handle:
+            complete = 0
+            for line in handle:
+                if not line.endswith(b"\n"):
+                    # Torn final line from an interrupted run: cut it off, or the next
+                    # append would be glued onto it and lost on the following load.
+                    handle.truncate(complete)
+                    break
+                complete += len(line)
+                try:
+                    record = json_utils.loads(line)
+                except json_utils.JSONDecodeError:
+                    continue
+                _apply_journal_record(log, record)
+    return log
 
 
 def save_sent_log(log: Dict) -> None:
-    with SENT_LOG_PATH.open("w", encoding="utf-8") as handle:
-        json.dump(log, handle, indent=2)
+    """Write a full snapshot and drop the journal it supersedes."""
+    global _journal
+    with _journal_lock:
+        # Replace the snapshot atomically: a crash mid-write must not leave a truncated
+        # sent_log.json next to a journal that still expects it.
+        tmp_path = SENT_LOG_PATH.with_name(SENT_LOG_PATH.name + ".tmp")
+        tmp_path.write_bytes(json_utils.dumps(log))
+        os.replace(tmp_path, SENT_LOG_PATH)
+        if _journal is not None:
+            _journal.close()
+            _journal = None
+        SENT_JOURNAL_PATH.unlink(missing_ok=True)
+
+
+def _sent_keys(name: str, email: str, role: str, company: str) -> Tuple[str, str]:
+    """Return the ``name::role::company`` key and its legacy ``email::role::company`` form."""
+    suffix = f"::{role}::{company}".lower()
+    return name.lower() + suffix, email.lower() + suffix
 
 
 def already_sent(log: Dict, name: str, email: str, role: str, company: str) -> bool:
-    key = f"{name.lower()}::{role.lower()}::{company.lower()}"
-    legacy_key = f"{email.lower()}::{role.lower()}::{company.lower()}"
+    key, legacy_key = _sent_keys(name, email, role, company)
     return key in log or legacy_key in log
 
 
 def mark_sent(log: Dict, name: str, email: str, role: str, company: str, msg_id: str) -> None:
-    key = f"{name.lower()}::{role.lower()}::{company.lower()}"
-    legacy_key = f"{email.lower()}::{role.lower()}::{company.lower()}"
-    log[key] = {"msg_id": msg_id, "ts": int(time.time())}
-    if legacy_key in log:
-        try:
-            del log[legacy_key]
-        except Exception:
-            pass
+    key, legacy_key = _sent_keys(name, email, role, company)
+    record = {"k": key, "msg_id": msg_id, "ts": int(time.time())}
+    if legacy_key != key and legacy_key in log:
+        record["drop"] = legacy_key
+    _apply_journal_record(log, record)
+    _append_journal(record)
+
+
+def _apply_journal_record(log: Dict, record: Dict) -> None:
+    log[record["k"]] = {"msg_id": record["msg_id"], "ts": record["ts"]}
+    legacy_key = record.get("drop")
+    if legacy_key:
+        log.pop(legacy_key, None)
+
+
+def _append_journal(record: Dict) -> None:
+    # One short line per send instead of rewriting the whole log; unbuffered so a crash
+    # loses at most the line being written.
+    global _journal
+    with _journal_lock:
+        if _journal is None:
+            _journal = SENT_JOURNAL_PATH.open("ab", buffering=0)
+        _journal.write(json_utils.dumps(record) + b"\n")
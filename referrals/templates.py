@@ -1,9 +1,13 @@
 from __future__ import annotations
 
+import collections
+import functools
+import os
+import re
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Optional, Tuple
 
-from jinja2 import Template
+from jinja2 import Environment, Template
 
 from .config import AppConfig
 
@@ -14,23 +18,120 @@ def _resolve_template_path(name: str, templates: Dict[str, str]) -> Path:
     return Path(filename)
 
 
+# Templates are cached below per file version, so Jinja's own mtime checks are redundant.
+_ENV = Environment(auto_reload=False, cache_size=-1)
+
+
+# There are only a handful of template kinds, so each file is read (and compiled) once per
+# version. Entries are keyed on mtime so a long-lived Runner picks up edited templates.
+def _mtime_ns(path: str) -> int:
+    return os.stat(path).st_mtime_ns
+
+
+@functools.lru_cache(maxsize=16)
+def _read_text_version(path: str, mtime_ns: int) -> str:
+    with open(path, "r", encoding="utf-8") as handle:
+        return handle.read()
+
+
+def _read_text(path: str) -> str:
+    return _read_text_version(path, _mtime_ns(path))
+
+
+@functools.lru_cache(maxsize=16)
+def _compile_version(path: str, mtime_ns: int) -> Template:
+    return _ENV.from_string(_read_text_version(path, mtime_ns))
+
+
+def _compile(path: str) -> Template:
+    return _compile_version(path, _mtime_ns(path))
+
+
+_VAR_RE = re.compile(r"{{\s*(\w+)\s*}}")
+_IF_RE = re.compile(r"{%\s*if\s+(\w+)\s*%}(.*?){%\s*endif\s*%}", re.DOTALL)
+
+# A specialized template: (condition, format string) pieces joined in order, where a piece
+# with a condition is emitted only when that context variable is truthy.
+_Pieces = Tuple[Tuple[Optional[str], str], ...]
+
+
+def _to_format_string(text: str) -> Optional[str]:
+    """Translate text made only of ``{{ var }}`` slots to a ``str.format`` string."""
+    parts = _VAR_RE.split(text)
+    literals = parts[0::2]
+    if any(marker in literal for literal in literals for marker in ("{{", "{%", "{#")):
+        return None
+    for i in range(0, len(parts), 2):
+        parts[i] = parts[i].replace("{", "{{").replace("}", "}}")
+    for i in range(1, len(parts), 2):
+        parts[i] = "{" + parts[i] + "}"
+    return "".join(parts)
+
+
+def _fast_template(path: str) -> Optional[_Pieces]:
+    return _fast_template_version(path, _mtime_ns(path))
+
+
+@functools.lru_cache(maxsize=16)
+def _fast_template_version(path: str, mtime_ns: int) -> Optional[_Pieces]:
+    """Specialize a template built from ``{{ var }}`` slots and flat ``{% if var %}`` blocks.
+
+    Returns None when the template uses any other Jinja syntax (nesting, else, filters,
+    comments), in which case it is rendered by Jinja.
+    """
+    text = _read_text_version(path, mtime_ns)
+    if text.endswith("\n"):
+        text = text[:-1]  # mirror Jinja dropping a single trailing newline
+    parts = _IF_RE.split(text)
+    pieces = []
+    for i in range(0, len(parts), 3):
+        fmt = _to_format_string(parts[i])
+        if fmt is None:
+            return None
+        pieces.append((None, fmt))
+        if i + 2 < len(parts):
+            inner = _to_format_string(parts[i + 2])
+            if inner is None:
+                return None
+            pieces.append((parts[i + 1], inner))
+    return tuple(piece for piece in pieces if piece[1])
+
+
+def render_template(config: AppConfig, kind: str, **context: str) -> str:
+    """Render a template, skipping Jinja for plain variables and flat ``if`` blocks."""
+    path = _resolve_template_path(kind, config.templates)
+    try:
+        pieces = _fast_template(str(path))
+    except Exception:
+        pieces = None
+    if pieces is not None:
+        values = collections.defaultdict(str, context)
+        return "".join(fmt.format_map(values) for condition, fmt in pieces if condition is None or values[condition])
+    return load_template(config, kind).render(**context)
+
+
 def load_template(config: AppConfig, kind: str) -> Template:
     path = _resolve_template_path(kind, config.templates)
     try:
-        with path.open("r", encoding="utf-8") as handle:
-            return Template(handle.read())
+        return _compile(str(path))
     except Exception:
-        fallback = Path(config.templates["cold"])
-        with fallback.open("r", encoding="utf-8") as handle:
-            return Template(handle.read())
+        return _compile(config.templates["cold"])
 
 
 def load_template_text(config: AppConfig, kind: str) -> str:
     path = _resolve_template_path(kind, config.templates)
     try:
-        with path.open("r", encoding="utf-8") as handle:
-            return handle.read()
+        return _read_text(str(path))
     except Exception:
-        fallback = Path(config.templates["cold"])
-        with fallback.open("r", encoding="utf-8") as handle:
-            return handle.read()
+        return _read_text(config.templates["cold"])
+
+
+def warm_templates(config: AppConfig) -> None:
+    """Read and compile every configured template up front so workers only hit the cache."""
+    for kind in config.templates:
+        path = str(_resolve_template_path(kind, config.templates))
+        try:
+            if _fast_template(path) is None:
+                _compile(path)
+        except Exception:
+            continue  # a missing template falls back to "cold" at render time